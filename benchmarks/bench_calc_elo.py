@@ -0,0 +1,75 @@
+"""Check estimate_opponent_elo_batch against the scalar estimate and time both.
+
+    python -m benchmarks.bench_calc_elo --rows 100000
+
+Every row is also run through estimate_opponent_elo; a row whose estimate
+or inconsistency flag differs is printed and the exit code is 1.
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+
+import numpy as np
+
+from utils.calc_elo import INCONSISTENT_ESTIMATE, estimate_opponent_elo, estimate_opponent_elo_batch
+
+
+def make_rows(count: int, seed: int = 5) -> tuple[list, list, list, list]:
+    rng = random.Random(seed)
+    my_elo = [rng.randint(0, 2200) for _ in range(count)]
+    # Includes changes of 0 and past K, which hit the clamp
+    elo_change = [rng.randint(-130, 130) for _ in range(count)]
+    # Mostly consistent results, some with the wrong sign
+    result = [(x >= 0) if rng.random() > 0.02 else (x < 0) for x in elo_change]
+    opponent_elo = [rng.choice((-2, 1000, rng.randint(200, 2200))) for _ in range(count)]
+    return my_elo, elo_change, [int(x) for x in result], opponent_elo
+
+
+def scalar(my_elo, elo_change, result, opponent_elo) -> tuple[list[int], list[bool]]:
+    estimates = []
+    inconsistent = []
+    for row in zip(my_elo, elo_change, result, opponent_elo):
+        try:
+            estimates.append(estimate_opponent_elo(*row))
+            inconsistent.append(False)
+        except ValueError:
+            estimates.append(INCONSISTENT_ESTIMATE)
+            inconsistent.append(True)
+    return estimates, inconsistent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    # Debug logging would time the log handlers rather than the estimate
+    logging.disable(logging.DEBUG)
+
+    rows = make_rows(args.rows, args.seed)
+    start = time.perf_counter()
+    expected, expected_mask = scalar(*rows)
+    scalar_time = time.perf_counter() - start
+
+    columns = [np.array(x) for x in rows]
+    start = time.perf_counter()
+    estimates, mask = estimate_opponent_elo_batch(*columns)
+    batch_time = time.perf_counter() - start
+
+    bad = np.flatnonzero((estimates != np.array(expected)) | (mask != np.array(expected_mask)))
+    print(f"{args.rows} rows, {int(mask.sum())} inconsistent")
+    print(f"  scalar {scalar_time * 1000:9.1f} ms {args.rows / scalar_time:>14,.0f} rows/s")
+    print(f"  batch  {batch_time * 1000:9.1f} ms {args.rows / batch_time:>14,.0f} rows/s")
+    if len(bad):
+        for i in bad[:10]:
+            print(f"  mismatch at {i}: {[x[i] for x in rows]} scalar {expected[i]} batch {estimates[i]}")
+        print(f"{len(bad)} rows differ")
+        return 1
+    print("  estimates and masks match")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Time EloReplay's checkpointed updates against replaying the whole history.
+
+    python -m benchmarks.bench_elo_replay --games 5000 --every 100
+
+Appends one game, corrects one near the start and backfills one missing
+game, checking each time that the result equals a full replay.
+"""
+import argparse
+import logging
+import sys
+import time
+
+from benchmarks.bench_records import make_records
+from utils.elo_replay import EloReplay
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--every", type=int, default=100, help="games between checkpoints")
+    args = parser.parse_args()
+    # Debug logging would time the log handlers rather than the replay
+    logging.disable(logging.DEBUG)
+
+    records = make_records(args.games + 1)
+    missing = records.pop(args.games // 2)
+    latest = records.pop()
+    replay, seconds = timed(lambda: EloReplay(records, args.every))
+    print(f"{len(records)} games, checkpoint every {args.every}")
+    print(f"  full replay  {seconds * 1000:8.1f} ms {replay.replayed:>7} games stepped")
+
+    old = records[10]
+    updates = [
+        ("append", [latest]),
+        ("correct", [old._replace(elo_change=-old.elo_change - 1, elo_rank_new=old.elo_rank_old - old.elo_change - 1)]),
+        ("backfill", [missing]),
+    ]
+    for name, games in updates:
+        before = replay.replayed
+        _, seconds = timed(lambda: replay.add(games))
+        full = EloReplay(replay.games, args.every)
+        same = full.estimates == replay.estimates and full.state == replay.state
+        print(
+            f"  {name:<12} {seconds * 1000:8.1f} ms {replay.replayed - before:>7} games stepped"
+            f"{'' if same else '  DIFFERS from a full replay'}"
+        )
+        if not same:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
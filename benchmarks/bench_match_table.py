@@ -0,0 +1,113 @@
+"""Compare history statistics over a list of Match objects with a MatchTable.
+
+    python -m benchmarks.bench_match_table --matches 5000
+
+Each side computes the win rate, longest streaks, per opponent results,
+per stage game results and a rolling 50 set win rate.
+"""
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from utils.match import Match
+from utils.match_table import WINNER_ME, MatchTable
+
+
+def make_matches(count: int) -> list[Match]:
+    rng = random.Random(11)
+    ts = datetime(2025, 1, 1, 20, 0, 0)
+    names = [f"player_{i}" for i in range(400)]
+    matches = []
+    for i in range(count):
+        ts += timedelta(minutes=rng.randint(4, 15))
+        change = rng.choice((-1, 1)) * rng.randint(5, 30)
+        games = rng.choice((2, 3))
+        picks = {}
+        for n in (1, 2, 3):
+            played = n <= games
+            picks[f"game_{n}_opponent_pick"] = rng.randint(1, 13) if played else -1
+            picks[f"game_{n}_stage"] = rng.randint(1, 7) if played else -1
+            picks[f"game_{n}_winner"] = rng.choice((1, 2)) if played else -1
+            picks[f"game_{n}_duration"] = rng.randint(60, 400) if played else -1
+        matches.append(
+            Match(
+                match_date=ts,
+                elo_change=change,
+                match_win=1 if change >= 0 else 0,
+                ranked_game_number=i + 1,
+                opponent_name=rng.choice(names),
+                **picks,
+            )
+        )
+    return matches
+
+
+def list_stats(matches: list[Match]):
+    wins = [x.match_win == 1 for x in matches]
+    win_rate = sum(wins) / len(wins)
+    best = {True: 0, False: 0}
+    run = 0
+    for i, won in enumerate(wins):
+        run = run + 1 if i and wins[i - 1] == won else 1
+        best[won] = max(best[won], run)
+    opponents = defaultdict(lambda: [0, 0, 0])
+    for x in matches:
+        row = opponents[x.opponent_name]
+        row[0] += 1
+        row[1] += x.match_win == 1
+        row[2] += x.elo_change
+    stages = defaultdict(lambda: [0, 0, 0])
+    for x in matches:
+        for n in (1, 2, 3):
+            stage = getattr(x, f"game_{n}_stage")
+            if stage >= 0:
+                row = stages[stage]
+                row[0] += 1
+                row[1] += getattr(x, f"game_{n}_winner") == WINNER_ME
+                row[2] += getattr(x, f"game_{n}_duration")
+    rolling = [sum(wins[i - 49 : i + 1]) / 50 for i in range(49, len(wins))]
+    return win_rate, best, opponents, stages, rolling
+
+
+def table_stats(table: MatchTable):
+    return (
+        table.win_rate(),
+        table.streaks(),
+        table.group_by("opponent_name"),
+        table.group_games("stage"),
+        table.rolling("match_win", 50),
+    )
+
+
+def timed(fn, *args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    matches = make_matches(args.matches)
+    start = time.perf_counter()
+    table = MatchTable.from_matches(matches)
+    build = time.perf_counter() - start
+
+    print(f"{len(matches)} matches, {len(table.names)} opponents")
+    print(f"  build MatchTable   {build * 1000:8.1f} ms")
+    print(f"  list of Match      {timed(list_stats, matches, repeat=args.repeat) * 1000:8.1f} ms")
+    print(f"  MatchTable         {timed(table_stats, table, repeat=args.repeat) * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
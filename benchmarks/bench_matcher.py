@@ -0,0 +1,94 @@
+"""Compare the old per-line matcher with the prefiltered and mmap scanners.
+
+    python -m benchmarks.bench_matcher --size-mb 300
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.synthetic_log import write_synthetic_log
+from utils.scanner import RankUpdate, scan_files
+
+# The matcher log_parser_optimized.find_rank_in_logs used before the scanner
+LEGACY_PATTERNS = {
+    "character": r"Character picked: (\w+)",
+    "stage": r"Stage selected: (\w+)",
+    "winner": r"Winner: (\w+)",
+    "final_move": r"Final move: (\d+)",
+}
+
+
+def legacy_extract_timestamp(line: str):
+    match = re.search(r"\[(\d{4}\.\d{2}\.\d{2})-(\d{2}\.\d{2}\.\d{2})", line)
+    if match:
+        try:
+            date_str = f"{match.group(1)} {match.group(2)}"
+            return datetime.strptime(date_str, "%Y.%m.%d %H.%M.%S")
+        except ValueError:
+            return None
+    return None
+
+
+def legacy_scan(path: str) -> int:
+    ranks = 0
+    data = {}
+    with open(path, "r") as f:
+        for line in f:
+            timestamp = legacy_extract_timestamp(line)
+            for key, pattern in LEGACY_PATTERNS.items():
+                match_obj = re.search(pattern, line)
+                if match_obj:
+                    data.setdefault(key, []).append((timestamp, match_obj.group(1)))
+            if "URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex" in line:
+                ranks += 1
+    return ranks
+
+
+def scanner_scan(path: str) -> int:
+    return sum(1 for x in scan_files([path]) if isinstance(x, RankUpdate))
+
+
+def mmap_scan(path: str) -> int:
+    return sum(1 for x in scan_files([path], use_mmap=True) if isinstance(x, RankUpdate))
+
+
+def count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def run(name: str, func, path: str, lines: int) -> float:
+    start = time.perf_counter()
+    ranks = func(path)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>8}: {ranks} rank updates in {elapsed:.2f}s, {lines / elapsed:,.0f} lines/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=300)
+    parser.add_argument("--log", help="Existing log to use instead of a synthetic one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.log
+        if not path:
+            path = os.path.join(tmp, "Rivals2.log")
+            print(f"Writing {args.size_mb:g} MB synthetic log...")
+            write_synthetic_log(path, args.size_mb)
+        lines = count_lines(path)
+        print(f"{lines:,} lines, {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        before = run("legacy", legacy_scan, path, lines)
+        after = run("scanner", scanner_scan, path, lines)
+        mapped = run("mmap", mmap_scan, path, lines)
+        print(f"speedup: {before / after:.1f}x (mmap {before / mapped:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Replay a synthetic log through parse_log against the stand-in backend.
+
+    python -m benchmarks.bench_network --size 10MB --latency 0.05 --failure-rate 0.02
+
+Reports the requests parse_log and the outbox drain made per route and
+their wall time. The parse runs in a child process whose app log dir is a
+temp folder, so the real event store, checkpoints and outbox are left alone.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic_log import parse_size, write_synthetic_log
+from devserver.backend import StandInBackend
+
+
+def run_child(url: str, game_dir: str):
+    import time
+
+    import log_parser
+    from utils import backend
+
+    backend.BASE_URL = url
+    log_parser.RIVALS_LOG_FOLDER = game_dir
+    start = time.perf_counter()
+    log_parser.parse_log(dev=0)
+    inserted, queued = log_parser.drain_outbox()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"elapsed": elapsed, "inserted": len(inserted), "queued": queued}))
+
+
+def run_parse(url: str, game_dir: str, app_dir: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_network", "--child", url, game_dir],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "RIVALS2_APP_LOG_DIR": app_dir},
+    )
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1:])
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="10MB", help="synthetic log size, e.g. 1MB, 100MB")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-bulk", action="store_true", help="backend without the bulk routes")
+    parser.add_argument("--noise", type=int, nargs=2, default=(200, 2000), metavar=("MIN", "MAX"), help="noise lines between sets, lower for more matches")
+    parser.add_argument("--runs", type=int, default=2, help="later runs show the incremental path")
+    parser.add_argument("--child", nargs=2, metavar=("URL", "GAME_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        game_dir = os.path.join(tmp, "game")
+        app_dir = os.path.join(tmp, "app")
+        os.makedirs(game_dir)
+        os.makedirs(app_dir)
+        sets = write_synthetic_log(os.path.join(game_dir, "Rivals2.log"), parse_size(args.size), noise=tuple(args.noise))
+        server = StandInBackend(
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            bulk=not args.no_bulk,
+        ).start()
+        print(
+            f"{args.size} log, {sets} sets, latency {args.latency}s, failure rate {args.failure_rate},"
+            f" {'no ' if args.no_bulk else ''}bulk routes"
+        )
+        try:
+            for run in range(1, args.runs + 1):
+                server.reset_counts()
+                stats = run_parse(server.url, game_dir, app_dir)
+                total = sum(server.requests.values())
+                print(
+                    f"\nrun {run}: {stats['elapsed']:.2f}s, {stats['inserted']} inserted,"
+                    f" {stats['queued']} queued, {total} requests, {sum(server.failures.values())} failed"
+                )
+                for route, count in sorted(server.requests.items()):
+                    print(f"  {route:<28} {count:>6}")
+        finally:
+            server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Throughput and memory of each parser over synthetic logs.
+
+    python -m benchmarks.bench_parsers --sizes 1MB 100MB 1GB
+
+Every parser runs in its own process so the peak RSS is its own.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_log import parse_size, write_synthetic_log
+
+TARGETS = (
+    "log_parser.find_rank_in_logs",
+    "log_parser_optimized.find_rank_in_logs",
+    "simple_parser.extract_rank_updates",
+    "match_duration.roll_up_durations",
+)
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(target: str, path: str):
+    module_name, func_name = target.split(".")
+    module = __import__(module_name)
+    func = getattr(module, func_name)
+    arg = path if module_name == "simple_parser" else [path]
+    import_rss = peak_rss_mb()
+    start = time.perf_counter()
+    result = func(arg)
+    elapsed = time.perf_counter() - start
+    items = len(result["durations"]) if isinstance(result, dict) else len(result)
+    print(json.dumps({"elapsed": elapsed, "items": items, "import_rss": import_rss, "peak_rss": peak_rss_mb()}))
+
+
+def count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def bench(target: str, path: str, lines: int, size_mb: float):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_parsers", "--child", target, path],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if out.returncode != 0:
+        print(f"{target:<40} failed: {out.stderr.strip().splitlines()[-1:]}")
+        return
+    stats = json.loads(out.stdout.strip().splitlines()[-1])
+    elapsed = stats["elapsed"]
+    print(
+        f"{target:<40} {stats['items']:>7} {lines / elapsed:>12,.0f} {size_mb / elapsed:>8.1f}"
+        f" {stats['peak_rss']:>9.1f} {stats['peak_rss'] - stats['import_rss']:>+9.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["1MB", "10MB", "100MB"])
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=TARGETS)
+    parser.add_argument("--child", nargs=2, metavar=("TARGET", "LOG"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            size_mb = parse_size(size)
+            path = os.path.join(tmp, "Rivals2.log")
+            write_synthetic_log(path, size_mb)
+            lines = count_lines(path)
+            print(f"\n{size}: {lines:,} lines")
+            print(f"{'parser':<40} {'matches':>7} {'lines/s':>12} {'MB/s':>8} {'peak MB':>9} {'run MB':>9}")
+            for target in args.targets:
+                bench(target, path, lines, size_mb)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
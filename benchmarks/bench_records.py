@@ -0,0 +1,125 @@
+"""Compare keeping raw rank update tuples with building a Match per record up front.
+
+    python -m benchmarks.bench_records --records 100000 --new 0.1
+
+The old parse_log validated a Match for every pending rank update and
+build_match validated it again before posting. Now the RankUpdate tuples
+go through the existence checks and only the new ones become a Match,
+once. --new is the share of records the backend doesn't have yet.
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from log_parser import build_match, match_from_rank_update
+from utils import calc_elo
+from utils.match import Match
+from utils.scanner import RankUpdate
+
+
+def make_records(count: int) -> list[RankUpdate]:
+    rng = random.Random(7)
+    ts = datetime(2025, 1, 1, 20, 0, 0)
+    elo = 1000
+    wins = 0
+    streak = 0
+    records = []
+    for i in range(count):
+        ts += timedelta(minutes=rng.randint(4, 15))
+        change = rng.choice((-1, 1)) * rng.randint(5, 30)
+        wins += change > 0
+        streak = streak + 1 if change > 0 else 0
+        records.append(RankUpdate("Rivals2.log", i * 120, i, ts, elo + change, elo, change, i + 1, wins, streak))
+        elo += change
+    return records
+
+
+def legacy_build(match: Match) -> Match:
+    # The second validation build_match used to do on an already built Match
+    return Match(
+        match_date=match.match_date.isoformat(),
+        elo_rank_new=match.elo_rank_new,
+        elo_rank_old=match.elo_rank_old,
+        elo_change=match.elo_change,
+        match_win=1 if match.elo_change >= 0 else 0,
+        match_forfeit=0,
+        ranked_game_number=match.ranked_game_number,
+        total_wins=match.total_wins,
+        win_streak_value=match.win_streak_value,
+        opponent_elo=match.opponent_elo,
+        opponent_estimated_elo=calc_elo.estimate_opponent_elo(
+            my_elo=match.elo_rank_new,
+            elo_change=match.elo_change,
+            result=1 if match.elo_change >= 0 else 0,
+            opponent_elo=1000,
+            k=24,
+        ),
+    )
+
+
+def legacy_path(records: list[RankUpdate], new: set[int]) -> list[Match]:
+    matches = [match_from_rank_update(x) for x in records]
+    return [legacy_build(x) for x in matches if x.ranked_game_number in new]
+
+
+def tuple_path(records: list[RankUpdate], new: set[int]) -> list[Match]:
+    return [build_match(x) for x in records if x.ranked_game_number in new]
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def retained_bytes(fn, *args) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = fn(*args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--new", type=float, default=0.1, help="share of records that still need posting")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    # With debug on every opponent estimate is logged, which would swamp the timings
+    logging.disable(logging.DEBUG)
+
+    records = make_records(args.records)
+    numbers = [x.ranked_game_number for x in records]
+    new = set(random.Random(3).sample(numbers, int(len(numbers) * args.new)))
+    print(f"{len(records)} records, {len(new)} new")
+
+    def per_sec(seconds: float) -> str:
+        return f"{len(records) / seconds:>12,.0f} records/s"
+
+    to_match = min(timed(lambda: [match_from_rank_update(x) for x in records]) for _ in range(args.repeat))
+    to_tuple = min(timed(lambda: [RankUpdate(*x) for x in records]) for _ in range(args.repeat))
+    print(f"  RankUpdate tuple        {to_tuple:8.3f}s {per_sec(to_tuple)}")
+    print(f"  Match (pydantic)        {to_match:8.3f}s {per_sec(to_match)}")
+
+    legacy = min(timed(legacy_path, records, new) for _ in range(args.repeat))
+    current = min(timed(tuple_path, records, new) for _ in range(args.repeat))
+    print(f"  Match for all, built 2x {legacy:8.3f}s {per_sec(legacy)}")
+    print(f"  tuples, new built once  {current:8.3f}s {per_sec(current)}")
+    print(f"  {legacy / current:.1f}x faster")
+
+    tuple_bytes = retained_bytes(lambda: [RankUpdate(*x) for x in records])
+    match_bytes = retained_bytes(lambda: [match_from_rank_update(x) for x in records])
+    print(f"  RankUpdate {tuple_bytes / len(records):8.0f} bytes/record")
+    print(f"  Match      {match_bytes / len(records):8.0f} bytes/record")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Compare the old per-call TypeAdapter and json.dumps encoding with utils.serialize.
+
+    python -m benchmarks.bench_serialize --matches 5000
+
+post_match built a TypeAdapter(Match) for every match and Copy wrote its
+dict with json.dumps. The serializer keeps one adapter and encodes a whole
+batch into one buffer.
+"""
+import argparse
+import dataclasses
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from utils import serialize
+from utils.match import Match
+
+
+def make_matches(count: int) -> list[Match]:
+    ts = datetime(2025, 1, 1, 20, 0, 0)
+    return [
+        Match(
+            match_date=ts + timedelta(minutes=9 * i),
+            elo_rank_new=1000 + i % 50,
+            elo_rank_old=990 + i % 50,
+            elo_change=10,
+            match_win=1,
+            ranked_game_number=i + 1,
+            opponent_name=f"player_{i % 300}",
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    matches = make_matches(args.matches)
+    dicts = [{**dataclasses.asdict(x), "match_date": x.match_date.isoformat()} for x in matches]
+    print(f"{len(matches)} matches, {'orjson' if serialize.orjson else 'pydantic_core'} for dicts")
+
+    cases = [
+        ("TypeAdapter per match", lambda: [TypeAdapter(Match).dump_json(x) for x in matches]),
+        ("dump_match per match", lambda: [serialize.dump_match(x) for x in matches]),
+        ("dump_matches, one buffer", lambda: serialize.dump_matches(matches)),
+        ("json.dumps per dict", lambda: [json.dumps(x) for x in dicts]),
+        ("serialize.dumps per dict", lambda: [serialize.dumps(x) for x in dicts]),
+    ]
+    for name, fn in cases:
+        seconds = timed(fn, args.repeat)
+        print(f"  {name:<26} {seconds * 1000:9.1f} ms {len(matches) / seconds:>12,.0f} matches/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
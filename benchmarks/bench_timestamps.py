@@ -0,0 +1,61 @@
+"""Micro-benchmark of the old regex + strptime timestamp path against parse_log_timestamp.
+
+    python -m benchmarks.bench_timestamps
+"""
+import argparse
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+from utils.timestamps import parse_log_timestamp
+
+
+def strptime_timestamp(line: str):
+    match = re.search(r"\[(\d{4}\.\d{2}\.\d{2})-(\d{2}\.\d{2}\.\d{2})", line)
+    if match:
+        try:
+            date_str = f"{match.group(1)} {match.group(2)}"
+            return datetime.strptime(date_str, "%Y.%m.%d %H.%M.%S")
+        except ValueError:
+            return None
+    return None
+
+
+def make_lines(count: int) -> list[str]:
+    ts = datetime(2025, 1, 1, 23, 0, 0)
+    lines = []
+    for i in range(count):
+        ts += timedelta(milliseconds=37)
+        lines.append(
+            f"[{ts:%Y.%m.%d-%H.%M.%S}:{ts.microsecond // 1000:03d}][{i % 1000:3d}]LogRivals: URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex 0: 1009, 998, 11, {i}, 200, 3\n"
+        )
+    return lines
+
+
+def run(name: str, func, lines: list[str]) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>12}: {len(lines) / elapsed:,.0f} lines/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=500_000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    mismatches = sum(strptime_timestamp(x) != parse_log_timestamp(x) for x in lines)
+    print(f"{args.lines:,} lines, {mismatches} mismatches")
+    before = run("strptime", strptime_timestamp, lines)
+    after = run("fixed-width", parse_log_timestamp, lines)
+    run("with millis", lambda x: parse_log_timestamp(x, millis=True), lines)
+    print(f"speedup: {before / after:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
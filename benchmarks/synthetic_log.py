@@ -0,0 +1,108 @@
+"""Synthetic Rivals2.log writer.
+
+    python -m benchmarks.synthetic_log Rivals2.log --size 100MB
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+
+HEADER_LINES = (
+    "Log file open, 01/01/25 12:00:00",
+    "LogWindows: Failed to load 'aqProf.dll' (GetLastError=126)",
+    "LogWindows: File 'aqProf.dll' does not exist",
+    "LogConfig: Display: Loading Windows ini files took 0.04 seconds",
+)
+
+NOISE_LINES = (
+    "LogNet: Warning: UNetConnection::Tick: Connection TIMED OUT. Closing connection.. Elapsed: 30.00",
+    "LogRivalsGame: Display: ARivalsGameMode::HandleMatchHasStarted PlayerCount 2 Spectators 0",
+    "LogStreaming: Display: FlushAsyncLoading: 1 QueuedPackages, 0 AsyncPackages",
+    "LogOnline: OSS: FOnlineSubsystemEOS::Tick Latency 42ms",
+    "LogAudio: Display: Audio Device (ID: 1) registered with world 'Training'.",
+    "LogSlate: Took 0.000123 seconds to synchronously load lazily loaded font '../../../Engine/Content/Slate/Fonts/Roboto-Regular.ttf' (155K)",
+    "LogRivalsUI: UMenuWidget::NativeConstruct Widget WBP_RankedQueue_C_2147482419",
+    "LogRollback: Verbose: Frame 18231 confirmed, 2 frames of rollback, input delay 3",
+    "LogRivalsNetwork: URivalsMatchmakingMessage::OnReceivedFromServer QueueStatus 1, EstimatedWait 35",
+    "LogRenderer: Reallocating scene render targets to support 2560x1440 Format 10 NumSamples 1 (Frame:4512).",
+    "LogUObjectHash: Compacting FUObjectHashTables data took   1.21ms",
+    "LogGarbage: Collecting garbage (purging 512 objects)",
+)
+
+STAGES = ("Aetherian Forest", "Godai Delta", "Hodojo", "Julesvale", "Merchant Port", "Air Armada")
+CHARACTERS = ("Loxodont", "Zetterburn", "Orcane", "Wrastor", "Kragg", "Forsburn", "Maypul", "Clairen", "Etalus", "Ranno", "Fleet", "Absa", "Olympia")
+
+SIZE_UNITS = {"KB": 1 / 1024, "MB": 1, "GB": 1024}
+
+
+def parse_size(text: str) -> float:
+    """'500', '500MB' or '1GB' as megabytes"""
+    text = text.strip().upper()
+    for unit, scale in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return float(text[: -len(unit)]) * scale
+    return float(text)
+
+
+def _stamp(ts: datetime) -> str:
+    return f"[{ts:%Y.%m.%d-%H.%M.%S}:{ts.microsecond // 1000:03d}][{ts.second:3d}]"
+
+
+def write_synthetic_log(path: str, size_mb: float, seed: int = 2, noise: tuple[int, int] = (200, 2000)) -> int:
+    """Write roughly size_mb of Unreal log noise with a ranked set every so often.
+
+    Each set is up to three games, each ending in an XP report with the game
+    duration, followed by the rank update, mirroring what the game logs.
+    noise is the range of noise lines written between sets.
+
+    Returns the number of ranked sets written.
+    """
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    ts = datetime(2025, 1, 1, 12, 0, 0)
+    elo = 1000
+    wins = 0
+    streak = 0
+    game_number = 0
+    with open(path, "w", newline="\n") as f:
+        written = f.write("".join(f"{x}\n" for x in HEADER_LINES))
+        while written < target:
+            chunk = []
+            for _ in range(rng.randint(*noise)):
+                ts += timedelta(milliseconds=rng.randint(1, 400))
+                chunk.append(f"{_stamp(ts)}{rng.choice(NOISE_LINES)}\n")
+            for _ in range(rng.randint(2, 3)):
+                ts += timedelta(seconds=rng.randint(90, 400))
+                chunk.append(f"{_stamp(ts)}LogRivals: Character picked: {rng.choice(CHARACTERS)}\n")
+                chunk.append(f"{_stamp(ts)}LogRivals: Stage selected: {rng.choice(STAGES).replace(' ', '')}\n")
+                chunk.append(
+                    f"{_stamp(ts)}LogRivals: RivalsCharacterXpEndMatchReportMessage::OnReceivedFromServer LocalPlayerIndex 0, matchDuration {rng.randint(60, 400)}\n"
+                )
+                chunk.append(f"{_stamp(ts)}LogRivals: Winner: Player{rng.randint(1, 2)}\n")
+                chunk.append(f"{_stamp(ts)}LogRivals: Final move: {rng.randint(1, 60)}\n")
+            won = rng.random() < 0.5
+            change = rng.randint(5, 30) * (1 if won else -1)
+            wins += won
+            streak = streak + 1 if won else 0
+            game_number += 1
+            chunk.append(
+                f"{_stamp(ts)}LogRivals: URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex 0: {elo + change}, {elo}, {change}, {game_number}, {wins}, {streak}\n"
+            )
+            elo += change
+            written += f.write("".join(chunk))
+    return game_number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--size", default="10MB", help="e.g. 1MB, 250MB, 1GB")
+    parser.add_argument("--seed", type=int, default=2)
+    args = parser.parse_args()
+    sets = write_synthetic_log(args.path, parse_size(args.size), args.seed)
+    print(f"Wrote {args.size} with {sets} ranked sets to {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
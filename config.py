@@ -24,6 +24,9 @@ class Config:
     # Logging settings
     @property
     def app_log_dir(self):
+        # Lets benchmarks keep their stores and checkpoints out of the real log dir
+        if os.environ.get('RIVALS2_APP_LOG_DIR'):
+            return os.path.abspath(os.environ['RIVALS2_APP_LOG_DIR'])
         if getattr(sys, 'frozen', False):
             # Running as exe - logs next to executable
             return os.path.join(os.path.dirname(sys.executable), self.config['logging']['app_log_dir'])
@@ -47,6 +50,10 @@ class Config:
     def game_log_file(self):
         return self.config['game']['game_log_file']
 
+    @property
+    def use_mmap(self):
+        return bool(int(self.config['game'].get('use_mmap', 0)))
+
     # Paths
     @property
     def replay_folder(self):
@@ -60,6 +67,10 @@ class Config:
     @property
     def be_port(self):
         return int(self.config['backend']['port'])
+
+    @property
+    def max_concurrency(self):
+        return int(self.config['backend'].get('max_concurrency', 4))
     
     # WebSocket settings
     @property
@@ -0,0 +1,298 @@
+"""Stand-in for the match backend on SQLite, with injectable latency and failures.
+
+    python -m devserver.backend --port 8005 --latency 0.05 --failure-rate 0.02
+
+Point [backend] in config.ini at it. Serves the routes the app uses,
+including the bulk ones; --no-bulk answers 404 there so the one-by-one
+fallbacks can be exercised too.
+"""
+import argparse
+import hashlib
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.current_state import TIERS, tier_for
+
+CHARACTERS = ("Zetterburn", "Orcane", "Wrastor", "Kragg", "Forsburn", "Maypul", "Clairen", "Etalus", "Ranno", "Fleet", "Loxodont", "Absa", "Olympia")
+STAGES = ("Aetherian Forest", "Godai Delta", "Hodojo", "Julesvale", "Merchant Port", "Air Armada", "Fire Capital")
+MOVES = ("Jab", "Ftilt", "Utilt", "Dtilt", "Dash Attack", "Fstrong", "Ustrong", "Dstrong", "Nair", "Fair", "Bair", "Uair", "Dair")
+
+BULK_ROUTES = ("/match-exists/bulk", "/insert-matches")
+
+
+def _reference_tables() -> dict:
+    characters = [{"id": -1, "display_name": "N/A", "list_order": 0}] + [
+        {"id": i, "display_name": x, "list_order": i} for i, x in enumerate(CHARACTERS, 1)
+    ]
+    stages = [
+        {
+            "id": -1,
+            "display_name": "N/A",
+            "list_order": 0,
+            "ranked_singles": 1,
+            "stage_type": "Singles",
+            "counter_pick": -1,
+        }
+    ] + [
+        {
+            "id": i,
+            "display_name": x,
+            "list_order": i,
+            "ranked_singles": 1,
+            "stage_type": "Singles",
+            # First three are starters, the rest counter picks
+            "counter_pick": 0 if i <= 3 else 1,
+        }
+        for i, x in enumerate(STAGES, 1)
+    ]
+    moves = [{"id": -1, "display_name": "N/A", "list_order": 0}] + [
+        {"id": i, "display_name": x, "list_order": i} for i, x in enumerate(MOVES, 1)
+    ]
+    top = [{"final_move_name": x} for x in MOVES[8:11]]
+    tiers = [
+        {
+            "id": i,
+            "tier_display_name": name,
+            "tier_short_name": short,
+            "min_threshold": floor,
+            "max_threshold": TIERS[i][0] - 1 if i < len(TIERS) else None,
+        }
+        for i, (floor, name, short) in enumerate(TIERS, 1)
+    ]
+    return {
+        "/characters": {"status": "SUCCESS", "data": characters},
+        "/stages": {"status": "SUCCESS", "data": stages},
+        "/movelist": {"status": "SUCCESS", "data": moves},
+        "/movelist/top": {"status": "SUCCESS", "data": top},
+        "/tiers": {"status": "SUCCESS", "data": tiers},
+    }
+
+
+class StandInBackend:
+    """The backend's HTTP routes over an SQLite matches table.
+
+    Every request waits latency seconds (plus up to jitter more) and fails
+    with a 503 at failure_rate. Counts of requests per route are in
+    requests.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        db: str = ":memory:",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        bulk: bool = True,
+        seed: int = 2,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.bulk = bulk
+        self.requests = Counter()
+        self.failures = Counter()
+        self.tables = _reference_tables()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS matches (ranked_game_number INTEGER PRIMARY KEY, body TEXT NOT NULL)"
+        )
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f"http://{host}:{self.port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> "StandInBackend":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+            self.failures.clear()
+
+    def _handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                backend._dispatch(self, "GET")
+
+            def do_POST(self):
+                backend._dispatch(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _dispatch(self, handler, method: str):
+        url = urlsplit(handler.path)
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        with self._lock:
+            self.requests[f"{method} {url.path}"] += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.failures[f"{method} {url.path}"] += 1
+            return self._send(handler, 503, {"status": "FAIL", "error": "injected failure"})
+        if url.path in BULK_ROUTES and not self.bulk:
+            return self._send(handler, 404, {"status": "FAIL", "error": "not found"})
+        route = getattr(self, f"_{method.lower()}_{url.path.strip('/').replace('/', '_').replace('-', '_')}", None)
+        if route is None:
+            return self._send(handler, 404, {"status": "FAIL", "error": "not found"})
+        try:
+            status, payload = route(parse_qs(url.query), json.loads(body) if body else None)
+        except (ValueError, KeyError, TypeError) as e:
+            status, payload = 400, {"status": "FAIL", "error": str(e)}
+        if url.path in self.tables:
+            return self._send_table(handler, payload)
+        self._send(handler, status, payload)
+
+    def _send(self, handler, status: int, payload, headers: dict = None):
+        data = json.dumps(payload).encode() if payload is not None else b""
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _send_table(self, handler, payload):
+        etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest() + '"'
+        if handler.headers.get("If-None-Match") == etag:
+            return self._send(handler, 304, None, {"ETag": etag})
+        self._send(handler, 200, payload, {"ETag": etag})
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _insert(self, match: dict) -> dict:
+        number = int(match["ranked_game_number"])
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO matches (ranked_game_number, body) VALUES (?, ?)",
+                (number, json.dumps(match)),
+            )
+        if cur.rowcount == 0:
+            return {"ranked_game_number": number, "error": "match already exists"}
+        return {"ranked_game_number": number, "status": "SUCCESS"}
+
+    def _get_match_exists(self, query, body):
+        number = int(query["match_number"][0])
+        found = self._query("SELECT 1 FROM matches WHERE ranked_game_number = ?", (number,))
+        return (200, {"status": "SUCCESS"}) if found else (404, {"status": "FAIL"})
+
+    def _post_match_exists_bulk(self, query, body):
+        if "match_numbers" in body:
+            numbers = [int(x) for x in body["match_numbers"]]
+        else:
+            numbers = list(range(int(body["start"]), int(body["end"]) + 1))
+        placeholders = ",".join("?" * len(numbers))
+        rows = self._query(
+            f"SELECT ranked_game_number FROM matches WHERE ranked_game_number IN ({placeholders})",
+            numbers,
+        ) if numbers else []
+        return 200, {"status": "SUCCESS", "data": {"existing": [x[0] for x in rows]}}
+
+    def _post_insert_match(self, query, body):
+        result = self._insert(body)
+        if "error" in result:
+            return 409, {"status": "FAIL", **result}
+        return 200, {"status": "SUCCESS", "data": result}
+
+    def _post_insert_matches(self, query, body):
+        return 200, {"status": "SUCCESS", "data": {"results": [self._insert(x) for x in body]}}
+
+    def _post_ui_user_lookup(self, query, body):
+        return 200, {"status": "SUCCESS"}
+
+    def _get_current_tier(self, query, body):
+        rows = self._query("SELECT body FROM matches ORDER BY ranked_game_number DESC LIMIT 1")
+        if not rows:
+            return 200, {
+                "status": "SUCCESS",
+                "data": {"current_elo": -2, "tier": "N/A", "tier_short": "N/A", "last_game_number": -2, "total_wins": 0, "win_streak_value": 0},
+            }
+        last = json.loads(rows[0][0])
+        tier, tier_short = tier_for(last["elo_rank_new"])
+        return 200, {
+            "status": "SUCCESS",
+            "data": {
+                "current_elo": last["elo_rank_new"],
+                "tier": tier,
+                "tier_short": tier_short,
+                "last_game_number": last["ranked_game_number"],
+                "total_wins": last["total_wins"],
+                "win_streak_value": last["win_streak_value"],
+            },
+        }
+
+    def _get_opponent_names(self, query, body):
+        rows = self._query("SELECT DISTINCT json_extract(body, '$.opponent_name') FROM matches")
+        return 200, {"status": "SUCCESS", "data": {"names": sorted(x[0] for x in rows if x[0])}}
+
+    def _get_characters(self, query, body):
+        return 200, self.tables["/characters"]
+
+    def _get_stages(self, query, body):
+        return 200, self.tables["/stages"]
+
+    def _get_movelist(self, query, body):
+        return 200, self.tables["/movelist"]
+
+    def _get_movelist_top(self, query, body):
+        return 200, self.tables["/movelist/top"]
+
+    def _get_tiers(self, query, body):
+        return 200, self.tables["/tiers"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8005)
+    parser.add_argument("--db", default=":memory:", help="SQLite file, in memory by default")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds, at random")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered 503")
+    parser.add_argument("--no-bulk", action="store_true", help="404 on the bulk routes")
+    args = parser.parse_args()
+    server = StandInBackend(
+        args.host, args.port, args.db, args.latency, args.jitter, args.failure_rate, not args.no_bulk
+    ).start()
+    print(f"Stand-in backend on {server.url}")
+    try:
+        while True:
+            time.sleep(60)
+            print(dict(server.requests))
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
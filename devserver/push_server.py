@@ -0,0 +1,106 @@
+"""Stand-in for the backend's WebSocket push channel.
+
+    python -m devserver.push_server --port 8008 --demo 5
+
+Point [websocket] in config.ini at it. Every message from the app is
+printed, and --demo broadcasts a made-up event every few seconds.
+"""
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.server import serve
+
+
+class PushServer:
+    """Broadcasts events to every connected client and keeps what they send"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, verbose: bool = False):
+        self.verbose = verbose
+        self.clients = set()
+        self.received = []
+        self._lock = threading.Lock()
+        self._server = serve(self._handle, host, port)
+        self.port = self._server.socket.getsockname()[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "PushServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._thread.join()
+
+    def _handle(self, ws):
+        with self._lock:
+            self.clients.add(ws)
+        try:
+            for message in ws:
+                event = json.loads(message)
+                with self._lock:
+                    self.received.append(event)
+                if self.verbose:
+                    print(f"<- {event}")
+        except ConnectionClosed:
+            pass
+        finally:
+            with self._lock:
+                self.clients.discard(ws)
+
+    def broadcast(self, kind: str, data: dict) -> int:
+        """Send an event to every client, returns how many got it"""
+        message = json.dumps({"type": kind, "data": data})
+        with self._lock:
+            clients = list(self.clients)
+        sent = 0
+        for ws in clients:
+            try:
+                ws.send(message)
+                sent += 1
+            except ConnectionClosed:
+                pass
+        if self.verbose:
+            print(f"-> {kind} {data} ({sent} clients)")
+        return sent
+
+
+def demo_events():
+    for n in itertools.count(1):
+        yield "opponent_names", {"added": [f"demo_player_{n}"], "removed": []}
+        yield "tier_changed", {
+            "current_elo": 1000 + n,
+            "tier": "Gold",
+            "tier_short": "GO",
+            "last_game_number": n,
+            "total_wins": n,
+            "win_streak_value": 1,
+        }
+        yield "reference_changed", {"path": "/movelist/top"}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8008)
+    parser.add_argument("--demo", type=float, metavar="SECONDS", help="broadcast a demo event this often")
+    args = parser.parse_args()
+    server = PushServer(args.host, args.port, verbose=True).start()
+    print(f"Push server on ws://{args.host}:{server.port}/")
+    events = demo_events()
+    try:
+        while True:
+            time.sleep(args.demo or 3600)
+            if args.demo:
+                server.broadcast(*next(events))
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from utils import backend
+
+# Enough threads to have every startup request in flight at once
+MAX_THREADS = 8
+
+_pool = QThreadPool()
+_pool.setMaxThreadCount(MAX_THREADS)
+# Tasks are kept alive here until their result has been delivered
+_running = set()
+
+
+class TaskSignals(QObject):
+    result = Signal(object)
+    error = Signal(object)
+
+
+class Task(QRunnable):
+    """Run a blocking call on the pool and hand its outcome back through signals.
+
+    The signals object is created on the GUI thread, so connected slots run
+    there even though the call itself doesn't.
+    """
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+
+
+def run_task(
+    fn: Callable,
+    *args,
+    on_result: Optional[Callable] = None,
+    on_error: Optional[Callable] = None,
+    **kwargs,
+) -> Task:
+    task = Task(fn, *args, **kwargs)
+    _running.add(task)
+    if on_result:
+        task.signals.result.connect(on_result)
+    if on_error:
+        task.signals.error.connect(on_error)
+    task.signals.result.connect(lambda _: _running.discard(task))
+    task.signals.error.connect(lambda _: _running.discard(task))
+    _pool.start(task)
+    return task
+
+
+def get_json(path: str):
+    """GET a backend path and return the decoded body, raising on failure"""
+    res = backend.get(path)
+    res.raise_for_status()
+    return res.json()
+
+
+def shutdown(timeout_ms: int = 2000):
+    """Drop queued tasks and give running ones a moment to finish"""
+    _pool.clear()
+    _pool.waitForDone(timeout_ms)
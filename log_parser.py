@@ -1,16 +1,22 @@
+import dataclasses
 import os
 import sys
-from typing import TextIO
-import re
-from datetime import datetime
+from typing import Iterable, TextIO
 import utils.calc_elo as calc_elo
 from utils.match import Match
 import requests
 import requests.exceptions
-from pydantic import TypeAdapter
 from config import Config
 from utils.log import setup_logging
-from match_duration import roll_up_durations
+from utils import backend, serialize
+from utils.event_store import EventStore
+from utils.match_table import MatchTable
+from utils.outbox import Outbox, drain
+from utils.pipeline import check_and_post
+from utils.backfill import find_backup_logs, scan_logs
+from utils.scanner import LogEvent, RankUpdate, parse_rank_update, scan_files
+from utils.tail import LogCheckpoint, TailReader, load_checkpoint, save_checkpoint
+from match_duration import roll_up_events
 
 
 if sys.platform == "win32":
@@ -29,13 +35,20 @@ config = Config()
 
 logger = setup_logging()
 
+# Last event store row known to be in the backend
+POSTED_WATERMARK = "posted"
 
-def search_file(file: TextIO, string: str):
+
+def search_file(file: TextIO, string: str, use_mmap: bool = False):
     lines = []
-    file.seek(0)
-    for line_no, line in enumerate(file, 1):
-        if string in line:
+    if use_mmap:
+        for _, _, line in TailReader(file.name).marker_lines((string.encode(),)):
             lines.append(line.strip())
+    else:
+        file.seek(0)
+        for line_no, line in enumerate(file, 1):
+            if string in line:
+                lines.append(line.strip())
     if lines:
         return lines
     else:
@@ -44,64 +57,45 @@ def search_file(file: TextIO, string: str):
 
 def see_if_game_exists(match_id, match_date):
     try:
-        res = requests.get(
-            f"http://{config.be_host}:{config.be_port}/match-exists?match_number={match_id}",
-            timeout=10,
-        )
-        return res.status_code == 200
+        return backend.match_exists(match_id)
     except requests.exceptions.RequestException as e:
         logger.error(f"Error checking match existence for {match_id}: {e}")
         return False  # Assume not exists on error
 
 
-def find_rank_in_logs(files: list[str]):
-    ranks = []
-    data = []
-    # with open(os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log"), 'r') as f:
-    #     x = search_file(f, "URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex")
-    #     if x:
-    #         data.extend(x)
-    for file in files:
-        with open(file, "r") as f:
-            x = search_file(
-                f, "URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex"
-            )
-            if x:
-                data.extend(x)
-    for line in data:
-        ranks.append(extract_numbers(line))
-    return ranks
+def find_rank_in_logs(files: list[str], checkpoints: dict[str, LogCheckpoint] = None):
+    """Find every rank update in the given logs.
+
+    When checkpoints is passed each file only has the bytes appended since its
+    checkpoint read, and the dict is updated with where reading stopped.
+    """
+    return matches_from_events(scan_files(files, checkpoints, config.use_mmap))
+
+
+def matches_from_events(events: Iterable[LogEvent]) -> list[Match]:
+    return [match_from_rank_update(x) for x in events if isinstance(x, RankUpdate)]
 
 
 def extract_numbers(line: str, file: str = None) -> Match:
-    result = {}
-    numbers = re.findall(r"-?\d+", line)
-    ranks = numbers[-6:]
-    match = re.search(r"\[(\d{4}\.\d{2}\.\d{2})-(\d{2}\.\d{2}\.\d{2})", line)
-    try:
-        if match:
-            date_str = f"{match.group(1)} {match.group(2)}"
-            dt = datetime.strptime(date_str, "%Y.%m.%d %H.%M.%S")
-        else:
-            dt = None
-    except:
-        logger.error(f"Couldn't extract date: {match.group(1)} {match.group(2)}")
-    win_loss = 0 if int(ranks[2]) < 0 else 1
+    return match_from_rank_update(parse_rank_update(line, file or ""))
+
+
+def match_from_rank_update(update: RankUpdate) -> Match:
     try:
         result = Match(
-            match_date=dt,
-            elo_rank_new=int(ranks[0]),
-            elo_rank_old=int(ranks[1]),
-            elo_change=int(ranks[2]),
-            ranked_game_number=int(ranks[3]),
-            total_wins=int(ranks[4]),
-            win_streak_value=int(ranks[5]),
+            match_date=update.timestamp,
+            elo_rank_new=update.elo_rank_new,
+            elo_rank_old=update.elo_rank_old,
+            elo_change=update.elo_change,
+            ranked_game_number=update.ranked_game_number,
+            total_wins=update.total_wins,
+            win_streak_value=update.win_streak_value,
             opponent_estimated_elo=-999,
         )
-    except:
+    except Exception:
         logger.error("Couldn't get ranks")
         result = Match(
-            match_date=dt,
+            match_date=update.timestamp if update else None,
             elo_change=-1900,
             win_streak_value=0,
             opponent_estimated_elo=-999,
@@ -113,10 +107,9 @@ def extract_numbers(line: str, file: str = None) -> Match:
 def post_match(match: Match) -> requests.Response | dict:
     try:
         logger.debug(f"Posting match: {match.ranked_game_number} to BE")
-        res = requests.post(
-            f"http://{config.be_host}:{config.be_port}/insert-match{'?debug=1' if int(config.debug) else ''}",
-            data=TypeAdapter(Match).dump_json(match),
-            timeout=10,
+        res = backend.post(
+            f"/insert-match{'?debug=1' if int(config.debug) else ''}",
+            data=serialize.dump_match(match),
         )
         res.raise_for_status()
         return res.json()
@@ -131,128 +124,185 @@ def post_match(match: Match) -> requests.Response | dict:
         return {"error": f"Failed to post match to backend: {e}"}
 
 
-def parse_log(dev: int, extra_data: dict = {}) -> list[Match] | int:
+def post_matches(matches: list[Match]) -> dict[int, dict]:
+    """Post matches in bulk, or one by one if the backend can't take a batch.
+
+    Returns each match's result by ranked game number, {"error": ...} on failure.
+    """
+    results = backend.insert_matches(matches, debug=bool(int(config.debug)))
+    if results is None:
+        results = {x.ranked_game_number: post_match(x) for x in matches}
+    return results
+
+
+def parse_log(dev: int, extra_data: dict = {}, all_logs: bool = False) -> list[Match] | int:
     logger.debug("Getting log files")
-    # replay_files = sorted(utils.folders.get_files(RIVALS_LOG_FOLDER))
-    # if "Rivals2.log" in replay_files:
-    #     replay_files.remove("Rivals2.log")
     replay_files = [os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log")]
-    logger.debug(f"Total files found: {len(replay_files)}")
+    # Backups from earlier game sessions, only read with all_logs
+    backup_files = find_backup_logs(RIVALS_LOG_FOLDER) if all_logs else []
+    logger.debug(f"Total files found: {len(replay_files) + len(backup_files)}")
 
     logger.info("Parsing data from logs")
-    data = find_rank_in_logs(replay_files)
-    count = []
-    new_matches = []
-    for match in data:
-        logger.debug(f"Checking game {match.ranked_game_number}")
-        if not see_if_game_exists(match.ranked_game_number, match.match_date):
-            new_matches.append(match)
-    potential_times = roll_up_durations(replay_files)
-    logger.debug(potential_times)
-    if len(new_matches) < 1:
-        return count
-    for match in new_matches:
-        res = None
-        if len(new_matches) == 1 and extra_data:
-            logger.debug(f"creating new_match, {len(new_matches)}, {extra_data}")
-            new_match = Match(
-                match_date=match.match_date.isoformat(),
-                elo_rank_new=match.elo_rank_new,
-                elo_rank_old=match.elo_rank_old,
-                elo_change=match.elo_change,
-                match_win=1 if match.elo_change >= 0 else 0,
-                match_forfeit=0,
-                ranked_game_number=match.ranked_game_number,
-                total_wins=match.total_wins,
-                win_streak_value=match.win_streak_value,
-                opponent_elo=extra_data["opponent_elo"],
-                opponent_estimated_elo=calc_elo.estimate_opponent_elo(
-                    my_elo=match.elo_rank_new,
-                    elo_change=match.elo_change,
-                    result=1 if match.elo_change >= 0 else 0,
-                    opponent_elo=extra_data["opponent_elo"],
-                ),
-                opponent_name=extra_data["opponent_name"],
-                game_1_char_pick=extra_data["game_1_char_pick"],
-                game_1_opponent_pick=extra_data["game_1_opponent_pick"],
-                game_1_stage=extra_data["game_1_stage"],
-                game_1_winner=extra_data["game_1_winner"],
-                game_1_final_move_id=extra_data["game_1_final_move_id"],
-                game_1_duration=extra_data["game_1_duration"],
-                game_2_char_pick=extra_data["game_2_char_pick"],
-                game_2_opponent_pick=extra_data["game_2_opponent_pick"],
-                game_2_stage=extra_data["game_2_stage"],
-                game_2_winner=extra_data["game_2_winner"],
-                game_2_final_move_id=extra_data["game_2_final_move_id"],
-                game_2_duration=extra_data["game_2_duration"],
-                game_3_char_pick=extra_data["game_3_char_pick"],
-                game_3_opponent_pick=extra_data["game_3_opponent_pick"],
-                game_3_stage=extra_data["game_3_stage"],
-                game_3_winner=extra_data["game_3_winner"],
-                game_3_final_move_id=extra_data["game_3_final_move_id"],
-                game_3_duration=extra_data["game_3_duration"],
-                final_move_id=extra_data["final_move_id"],
-            )
+    events = scan_logs(backup_files) if backup_files else []
+    checkpoints = {file: load_checkpoint(file) for file in replay_files}
+    # One pass over the logs feeds both the rank updates and the durations
+    events.extend(scan_files(replay_files, checkpoints, config.use_mmap))
+
+    store = EventStore()
+    try:
+        store.add_events(events)
+        # Everything read is in the store now, so the logs never need
+        # re-reading; the watermark below tracks what was handed on
+        for checkpoint in checkpoints.values():
+            save_checkpoint(checkpoint)
+        pending = store.rank_updates_since(store.get_watermark(POSTED_WATERMARK))
+        logger.debug(roll_up_events(events))
+        updates = [x for _, x in pending]
+        if dev:
+            count = check_new_matches(updates, extra_data)
         else:
-            new_match = Match(
-                match_date=match.match_date.isoformat(),
-                elo_rank_new=match.elo_rank_new,
-                elo_rank_old=match.elo_rank_old,
-                elo_change=match.elo_change,
-                match_win=1 if match.elo_change >= 0 else 0,
-                match_forfeit=0,
-                ranked_game_number=match.ranked_game_number,
-                total_wins=match.total_wins,
-                win_streak_value=match.win_streak_value,
-                opponent_elo=match.opponent_elo,
-                opponent_estimated_elo=calc_elo.estimate_opponent_elo(
-                    my_elo=match.elo_rank_new,
-                    elo_change=match.elo_change,
-                    result=1 if match.elo_change >= 0 else 0,
-                    opponent_elo=1000,
-                    k=24,
-                ),
-                opponent_name=match.opponent_name,
-                game_1_char_pick=match.game_1_char_pick,
-                game_1_opponent_pick=match.game_1_opponent_pick,
-                game_1_stage=match.game_1_stage,
-                game_1_winner=match.game_1_winner,
-                game_1_final_move_id=match.game_1_final_move_id,
-                game_2_char_pick=match.game_2_char_pick,
-                game_2_opponent_pick=match.game_2_opponent_pick,
-                game_2_stage=match.game_2_stage,
-                game_2_winner=match.game_2_winner,
-                game_2_final_move_id=match.game_2_final_move_id,
-                game_3_char_pick=match.game_3_char_pick,
-                game_3_opponent_pick=match.game_3_opponent_pick,
-                game_3_stage=match.game_3_stage,
-                game_3_winner=match.game_3_winner,
-                game_3_final_move_id=match.game_3_final_move_id,
-                final_move_id=match.final_move_id,
-            )
-
-        try:
-            if not dev:
-                logger.debug(f"Posting match: {new_match.ranked_game_number} to BE")
-                res = post_match(new_match)
-                logger.info(res)
-
-        except Exception as e:
-            logger.error(f"why did posting fail?? {e}|{res}")
-        try:
-            if not dev:
-                logger.info(
-                    f"Inserted match: Game {new_match.ranked_game_number}, Rank {new_match.elo_rank_new}, Change {new_match.elo_change}, Final Move {new_match.final_move_id}, res: {res}"
-                )
-        except Exception as e:
-            logger.error(f"Something bonked lol: {e}")
-        count.append(match)
+            count = queue_matches(updates, extra_data)
+            if pending:
+                # Queued matches are the outbox's to deliver now
+                store.set_watermark(POSTED_WATERMARK, max(row_id for row_id, _ in pending))
+    finally:
+        store.close()
 
     return count
 
 
+def build_match(update: RankUpdate, extra_data: dict = None) -> Match:
+    """The validated match to post, with the GUI's picks and durations when given.
+
+    Parsing and existence checks only pass the raw rank update tuples around,
+    so this is the one place a Match gets built and validated.
+    """
+    match = Match(
+        match_date=update.timestamp,
+        elo_rank_new=update.elo_rank_new,
+        elo_rank_old=update.elo_rank_old,
+        elo_change=update.elo_change,
+        match_win=1 if update.elo_change >= 0 else 0,
+        match_forfeit=0,
+        ranked_game_number=update.ranked_game_number,
+        total_wins=update.total_wins,
+        win_streak_value=update.win_streak_value,
+        opponent_estimated_elo=calc_elo.estimate_opponent_elo(
+            my_elo=update.elo_rank_new,
+            elo_change=update.elo_change,
+            result=1 if update.elo_change >= 0 else 0,
+            opponent_elo=1000,
+            k=24,
+        ),
+    )
+    return with_extra_data(match, extra_data) if extra_data else match
+
+
+def with_extra_data(match: Match, extra_data: dict) -> Match:
+    """The match with the opponent, picks, stages, moves and durations from the GUI"""
+    logger.debug(f"creating new_match, {extra_data}")
+    return dataclasses.replace(
+        match,
+        opponent_elo=extra_data["opponent_elo"],
+        opponent_estimated_elo=calc_elo.estimate_opponent_elo(
+            my_elo=match.elo_rank_new,
+            elo_change=match.elo_change,
+            result=1 if match.elo_change >= 0 else 0,
+            opponent_elo=extra_data["opponent_elo"],
+        ),
+        opponent_name=extra_data["opponent_name"],
+        final_move_id=extra_data["final_move_id"],
+        **{
+            f"game_{n}_{field}": extra_data[f"game_{n}_{field}"]
+            for n in (1, 2, 3)
+            for field in ("char_pick", "opponent_pick", "stage", "winner", "final_move_id", "duration")
+        },
+    )
+
+
+def queue_matches(data: list[RankUpdate], extra_data: dict = {}) -> list[RankUpdate]:
+    """Hand the pending games to the outbox, which checks and posts them.
+
+    Parsing never waits on the backend; the outbox drainer (or main, from the
+    command line) sends them. The raw rank updates are queued, and a Match is
+    only built at drain time for games the backend doesn't have. The GUI's
+    extra_data is queued with every game and applied at drain time if only
+    one of them is new.
+
+    Returns the rank updates queued, in ranked game number order.
+    """
+    updates = sorted(data, key=lambda x: x.ranked_game_number)
+    if not updates:
+        return updates
+    outbox = Outbox()
+    try:
+        outbox.add(updates, extra_data)
+    finally:
+        outbox.close()
+    logger.info(f"Queued {len(updates)} games to send: {[x.ranked_game_number for x in updates]}")
+    return updates
+
+
+def check_new_matches(data: list[RankUpdate], extra_data: dict = {}) -> list[Match]:
+    """The matches the backend doesn't have yet, without posting them.
+
+    Only used in dev mode. Existence checks run through the check/post
+    pipeline, with several batches in flight at once.
+    """
+    logger.debug(f"Checking {len(data)} games")
+    results = check_and_post(
+        data,
+        backend.existing_matches,
+        build_match,
+        concurrency=config.max_concurrency,
+        batch_size=backend.insert_batch_size(),
+    )
+    failed = [x.ranked_game_number for x, res in results if isinstance(res, dict) and "error" in res]
+    if failed:
+        logger.error(f"Could not check {len(failed)} games: {failed}")
+    matches = [x for x, res in results if not (isinstance(res, dict) and "error" in res)]
+    # The GUI's extra_data is for the set just played, so only when it's the one new match
+    if extra_data and len(matches) == 1:
+        matches = [with_extra_data(matches[0], extra_data)]
+    return matches
+
+
+def drain_outbox(outbox: Outbox = None) -> tuple[list[int], int]:
+    """Retry the queued matches that are due, see utils.outbox.drain"""
+    if outbox is not None:
+        return drain(
+            outbox,
+            backend.existing_matches,
+            build_match,
+            post_matches,
+            concurrency=config.max_concurrency,
+            batch_size=backend.insert_batch_size(),
+        )
+    outbox = Outbox()
+    try:
+        return drain_outbox(outbox)
+    finally:
+        outbox.close()
+
+
+def match_table(store: EventStore = None) -> MatchTable:
+    """Every rank update in the event store as columns, oldest game first"""
+    if store is not None:
+        return MatchTable.from_rank_updates(x for _, x in store.rank_updates_since(0))
+    store = EventStore()
+    try:
+        return match_table(store)
+    finally:
+        store.close()
+
+
 def main():
-    parse_log(dev=int(config.debug))
+    dev = int(config.debug)
+    parse_log(dev=dev, all_logs="--all-logs" in sys.argv)
+    if not dev:
+        sent, left = drain_outbox()
+        if sent or left:
+            logger.info(f"Outbox: sent {len(sent)} queued matches, {left} still queued")
 
     return 0
 
@@ -1,17 +1,26 @@
 import os
 import sys
-from typing import TextIO
-import re
+from typing import Iterable, TextIO
 from datetime import datetime
 import utils.calc_elo as calc_elo
 from utils.match import Match
 import requests
 import requests.exceptions
-import json
-from pydantic import TypeAdapter
 from config import Config
 from utils.log import setup_logging
-from match_duration import roll_up_durations
+from utils import backend, serialize
+from utils.scanner import (
+    CharacterPick,
+    FinalMove,
+    LogEvent,
+    RankUpdate,
+    StageSelect,
+    Winner,
+    parse_rank_update,
+    scan_files,
+)
+from utils.tail import LogCheckpoint, checkpoint_file, load_checkpoint, save_checkpoint
+from match_duration import roll_up_events
 
 
 if sys.platform == "win32":
@@ -30,28 +39,16 @@ config = Config()
 
 logger = setup_logging()
 
-# Patterns for extracting additional match data
-PATTERNS = {
-    "character": r"Character picked: (\w+)",
-    "stage": r"Stage selected: (\w+)",
-    "winner": r"Winner: (\w+)",
-    "final_move": r"Final move: (\d+)",
-}
-
-# Cache file for incremental parsing
-CACHE_FILE = os.path.join("logs", "last_parsed.json")
-
-
-def load_cache():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r") as f:
-            return json.load(f)
-    return {"last_timestamp": None, "parsed_matches": []}
-
+# Separate from log_parser's, which can move on once events are stored
+CHECKPOINT_FILE = checkpoint_file("optimized")
 
-def save_cache(cache):
-    with open(CACHE_FILE, "w") as f:
-        json.dump(cache, f)
+# Scanner events used to enrich matches, keyed by their extract_numbers name
+ENRICH_EVENTS = {
+    CharacterPick: "character",
+    StageSelect: "stage",
+    Winner: "winner",
+    FinalMove: "final_move",
+}
 
 
 def search_file(file: TextIO, string: str):
@@ -66,76 +63,51 @@ def search_file(file: TextIO, string: str):
         return False
 
 
-def extract_timestamp(line: str):
-    match = re.search(r"\[(\d{4}\.\d{2}\.\d{2})-(\d{2}\.\d{2}\.\d{2})", line)
-    if match:
-        try:
-            date_str = f"{match.group(1)} {match.group(2)}"
-            return datetime.strptime(date_str, "%Y.%m.%d %H.%M.%S")
-        except:
-            return None
-    return None
-
-
 def see_if_game_exists_batch(match_ids):
+    # One bulk request, falling back to concurrent single checks
     try:
-        # Batch check - assuming API supports it; otherwise, loop with individual calls
-        existing = []
-        for match_id in match_ids:
-            res = requests.get(
-                f"http://{config.be_host}:{config.be_port}/match-exists?match_number={match_id}",
-                timeout=10,
-            )
-            if res.status_code == 200:
-                existing.append(match_id)
-        return existing
+        return backend.existing_matches(match_ids)
     except requests.exceptions.RequestException as e:
         logger.error(f"Error checking match existence: {e}")
-        return []  # Assume none exist on error
+        return set()  # Assume none exist on error
+
 
+def find_rank_in_logs(files: list[str], checkpoints: dict[str, LogCheckpoint] = None):
+    # Incremental: resume from the byte offset of the last run
+    return ranks_from_events(scan_files(files, checkpoints, config.use_mmap))
 
-def find_rank_in_logs(files: list[str], last_timestamp=None):
+
+def ranks_from_events(events: Iterable[LogEvent]) -> list[Match]:
     ranks = []
     data = {}
-    for file in files:
-        with open(file, "r") as f:
-            # Incremental: skip lines before last_timestamp
-            for line in f:
-                timestamp = extract_timestamp(line)
-                if last_timestamp and timestamp and timestamp <= last_timestamp:
-                    continue
-                for key, pattern in PATTERNS.items():
-                    match_obj = re.search(pattern, line)
-                    if match_obj:
-                        if key not in data:
-                            data[key] = []
-                        value = match_obj.group(1) if match_obj.groups() else None
-                        data[key].append((timestamp, value))
-                if (
-                    "URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex"
-                    in line
-                ):
-                    ranks.append(extract_numbers(line, data))
+    for event in events:
+        if isinstance(event, RankUpdate):
+            ranks.append(match_from_rank_update(event, data))
+        elif type(event) in ENRICH_EVENTS:
+            data.setdefault(ENRICH_EVENTS[type(event)], []).append(
+                (event.timestamp, event.value)
+            )
     return ranks
 
 
 def extract_numbers(line: str, extra_data: dict = {}) -> Match:
-    result = {}
-    numbers = re.findall(r"-?\d+", line)
-    ranks = numbers[-6:]
-    match_dt = extract_timestamp(line)
+    return match_from_rank_update(parse_rank_update(line), extra_data)
+
+
+def match_from_rank_update(update: RankUpdate, extra_data: dict = {}) -> Match:
+    match_dt = update.timestamp if update else None
     try:
         result = Match(
             match_date=match_dt or datetime(1900, 1, 1),
-            elo_rank_new=int(ranks[0]),
-            elo_rank_old=int(ranks[1]),
-            elo_change=int(ranks[2]),
-            ranked_game_number=int(ranks[3]),
-            total_wins=int(ranks[4]),
-            win_streak_value=int(ranks[5]),
+            elo_rank_new=update.elo_rank_new,
+            elo_rank_old=update.elo_rank_old,
+            elo_change=update.elo_change,
+            ranked_game_number=update.ranked_game_number,
+            total_wins=update.total_wins,
+            win_streak_value=update.win_streak_value,
             opponent_estimated_elo=-999,
         )
-    except:
+    except Exception:
         logger.error("Couldn't get ranks")
         result = Match(
             match_date=match_dt or datetime(1900, 1, 1),
@@ -166,10 +138,9 @@ def extract_numbers(line: str, extra_data: dict = {}) -> Match:
 def post_match(match: Match) -> requests.Response | dict:
     try:
         logger.debug(f"Posting match: {match.ranked_game_number} to BE")
-        res = requests.post(
-            f"http://{config.be_host}:{config.be_port}/insert-match{'?debug=1' if int(config.debug) else ''}",
-            data=TypeAdapter(Match).dump_json(match),
-            timeout=10,
+        res = backend.post(
+            f"/insert-match{'?debug=1' if int(config.debug) else ''}",
+            data=serialize.dump_match(match),
         )
         res.raise_for_status()
         return res.json()
@@ -189,14 +160,12 @@ def parse_log(dev: int, extra_data: dict = {}) -> list[Match] | int:
     replay_files = [os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log")]
     logger.debug(f"Total files found: {len(replay_files)}")
 
-    # Load cache for incremental parsing
-    cache = load_cache()
-    last_timestamp = cache.get("last_timestamp")
-    if last_timestamp:
-        last_timestamp = datetime.fromisoformat(last_timestamp)
+    # Load checkpoints for incremental parsing
+    checkpoints = {file: load_checkpoint(file, CHECKPOINT_FILE) for file in replay_files}
 
     logger.info("Parsing data from logs (incremental)")
-    data = find_rank_in_logs(replay_files, last_timestamp)
+    events = list(scan_files(replay_files, checkpoints, config.use_mmap))
+    data = ranks_from_events(events)
     count = []
     new_matches = []
     match_ids = [match.ranked_game_number for match in data]
@@ -205,10 +174,11 @@ def parse_log(dev: int, extra_data: dict = {}) -> list[Match] | int:
         if match.ranked_game_number not in existing:
             new_matches.append(match)
 
-    potential_times = roll_up_durations(replay_files)
+    potential_times = roll_up_events(events)
     logger.debug(potential_times)
 
-    for match in data:
+    failed = False
+    for match in new_matches:
         res = None
         if extra_data:
             logger.debug(f"creating new_match, {len(new_matches)}, {extra_data}")
@@ -295,9 +265,11 @@ def parse_log(dev: int, extra_data: dict = {}) -> list[Match] | int:
                 logger.debug(f"Posting match: {new_match.ranked_game_number} to BE")
                 res = post_match(new_match)
                 logger.info(res)
+                failed = failed or "error" in res
 
         except Exception as e:
             logger.error(f"why did posting fail?? {e}|{res}")
+            failed = True
         try:
             if not dev:
                 logger.info(
@@ -307,13 +279,11 @@ def parse_log(dev: int, extra_data: dict = {}) -> list[Match] | int:
             logger.error(f"Something bonked lol: {e}")
         count.append(match)
 
-    if data:
-        latest_ts = max(
-            (m.match_date for m in data if m.match_date), default=last_timestamp
-        )
-        if latest_ts:
-            cache["last_timestamp"] = latest_ts.isoformat()
-        save_cache(cache)
+    # This parser has no event store, so it only moves past matches once
+    # they all reached the backend; a failed run reads them again
+    if not dev and not failed:
+        for checkpoint in checkpoints.values():
+            save_checkpoint(checkpoint, CHECKPOINT_FILE)
 
     return count
 
@@ -0,0 +1,140 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+from match_duration import LOOKAHEAD_LINES, add_duration
+from utils.log import setup_logging
+from utils.scanner import MatchDuration, RankUpdate, scan_lines
+from utils.tail import TailReader
+
+logger = setup_logging()
+
+POLL_INTERVAL = 0.25
+# Re-check the file at least this often even when inotify is quiet
+WAKE_INTERVAL = 1.0
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
+
+class Inotify:
+    """Minimal inotify watch on a folder through libc"""
+
+    def __init__(self, folder: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the folder rather than the file so a recreated log is seen too
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, timeout: float) -> bool:
+        """Block until something changes in the folder or the timeout passes"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogWatcher(QThread):
+    """Follow the game log and report each finished match as it is written.
+
+    Uses inotify on Linux and falls back to polling the file otherwise. The
+    tail reader's checkpoint catches the game truncating or recreating the
+    log, in which case following starts again from the top of the new file.
+    """
+
+    match_finished = Signal(object, list)
+    durations_updated = Signal(list)
+    error = Signal(str)
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._running = True
+        self.checkpoint = None
+        self.line_base = 0
+        self.durations = []
+        self.last_update = None
+        self.last_durations = []
+
+    def run(self):
+        inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                inotify = Inotify(os.path.dirname(self.path))
+            except OSError as e:
+                logger.warning(f"inotify unavailable, polling {self.path}: {e}")
+        try:
+            while self._running:
+                self.read_new_lines()
+                if inotify:
+                    inotify.wait(WAKE_INTERVAL)
+                else:
+                    time.sleep(POLL_INTERVAL)
+        finally:
+            if inotify:
+                inotify.close()
+
+    def read_new_lines(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            if self.checkpoint is None:
+                # Only matches played from now on
+                reader = TailReader.at_end(self.path)
+            else:
+                reader = TailReader(self.path, self.checkpoint)
+            if reader.reset:
+                self.line_base = 0
+                self.durations = []
+                self.last_update = None
+            for event in scan_lines(reader, self.path, self.line_base):
+                self.handle_event(event)
+            self.line_base += reader.lines
+            self.checkpoint = reader.checkpoint()
+        except OSError as e:
+            logger.error(f"Error following {self.path}: {e}")
+            self.error.emit(str(e))
+
+    def handle_event(self, event):
+        if isinstance(event, RankUpdate):
+            self.last_update = event
+            self.last_durations = self.durations
+            self.durations = []
+            self.match_finished.emit(event, list(self.last_durations))
+        elif isinstance(event, MatchDuration):
+            # The last game's duration is usually logged just after the rank update
+            if (
+                self.last_update is not None
+                and event.line_no - self.last_update.line_no <= LOOKAHEAD_LINES
+            ):
+                self.last_update = None
+                add_duration(self.last_durations, event.duration)
+                self.durations_updated.emit(list(self.last_durations))
+            else:
+                add_duration(self.durations, event.duration)
+
+    def stop(self):
+        self._running = False
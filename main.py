@@ -2,6 +2,7 @@ from pathlib import Path
 import sys
 import os
 import signal
+import multiprocessing
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -27,12 +28,21 @@ import requests.exceptions
 import traceback
 import json
 from datetime import datetime, timezone
+from functools import partial
 import log_parser
 from log_parser import RIVALS_LOG_FOLDER
-from match_duration import roll_up_durations
+from match_duration import last_match_durations
 from config import Config
 from utils.log import setup_logging
+from utils import backend, serialize
+from utils.reference_cache import REFERENCE_PATHS, ReferenceCache
+from utils.current_state import LOCAL_STATUS, cached_tiers, current_state, reconcile
 from ping_check import PingWorker, PingDialog
+from log_watcher import LogWatcher
+from outbox_drainer import OutboxDrainer
+from push_client import PushClient
+from gui_tasks import get_json, run_task
+import gui_tasks
 
 config = Config()
 
@@ -40,7 +50,26 @@ characters = {}
 stages = {}
 moves = {}
 top_moves = []
+REFERENCE_NAMES = {
+    "/characters": "character data",
+    "/stages": "stage data",
+    "/movelist": "move data",
+    "/movelist/top": "final move data",
+    "/tiers": "tier data",
+}
 STARTING_DEFAULT = config.opp_dir
+# What the ELO widgets show when /current_tier can't be reached
+CURRENT_ELO_FALLBACK = {
+    "status": "FAIL",
+    "data": {
+        "current_elo": -2,
+        "tier": "N/A",
+        "tier_short": "N/A",
+        "last_game_number": -2,
+        "total_wins": -2,
+        "win_streak_value": -2,
+    },
+}
 
 
 def resource_path(relative_path):
@@ -63,14 +92,17 @@ class ParserWorker(QThread):
     error = Signal(str)
     update_output = Signal(str)
 
-    def __init__(self, dev, extra_data):
+    def __init__(self, dev, extra_data, all_logs=False):
         super().__init__()
         self.dev = dev
         self.extra_data = extra_data
+        self.all_logs = all_logs
 
     def run(self):
         try:
-            result = log_parser.parse_log(dev=self.dev, extra_data=self.extra_data)
+            result = log_parser.parse_log(
+                dev=self.dev, extra_data=self.extra_data, all_logs=self.all_logs
+            )
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
@@ -100,13 +132,28 @@ class MainWindow(QMainWindow):
         self.move(screen.width() - self.width(), 0)
 
         self.setup_ui()
-        self.populate_dropdowns()
+        self.reference_cache = ReferenceCache()
+        self.load_reference_data()
+        self.refresh_top_row()
+        self.refresh_opponent_names()
         self.setup_reset_menus()
         self.adjustSize()
 
         self.ping_worker = PingWorker()
         self.ping_worker.start()
 
+        self.outbox_drainer = OutboxDrainer()
+        self.outbox_drainer.sent.connect(self.on_outbox_sent)
+        self.outbox_drainer.start()
+
+        self.push_client = PushClient()
+        self.push_client.match_inserted.connect(self.on_match_inserted)
+        self.push_client.tier_changed.connect(self.on_tier_changed)
+        self.push_client.reference_changed.connect(self.on_reference_changed)
+        self.push_client.opponent_names_changed.connect(self.on_opponent_names_changed)
+        self.push_client.connection_changed.connect(self.on_push_connection_changed)
+        self.push_client.start()
+
     def closeEvent(self, event):
         if hasattr(self, "worker") and self.worker.isRunning():
             self.worker.quit()
@@ -114,6 +161,16 @@ class MainWindow(QMainWindow):
         if hasattr(self, "ping_worker"):
             self.ping_worker.stop()
             self.ping_worker.wait()
+        if hasattr(self, "log_watcher"):
+            self.log_watcher.stop()
+            self.log_watcher.wait()
+        if hasattr(self, "outbox_drainer"):
+            self.outbox_drainer.stop()
+            self.outbox_drainer.wait()
+        if hasattr(self, "push_client"):
+            self.push_client.stop()
+            self.push_client.wait()
+        gui_tasks.shutdown()
         event.accept()
 
     def setup_ui(self):
@@ -152,6 +209,15 @@ class MainWindow(QMainWindow):
         self.debug_checkbox = QCheckBox("Debug")
         top_row2.addWidget(self.debug_checkbox)
 
+        self.all_logs_checkbox = QCheckBox("All Logs")
+        self.all_logs_checkbox.setToolTip("Also parse backup logs from earlier sessions")
+        top_row2.addWidget(self.all_logs_checkbox)
+
+        self.follow_checkbox = QCheckBox("Follow")
+        self.follow_checkbox.setToolTip("Fill in ELO and durations as each set finishes")
+        self.follow_checkbox.toggled.connect(self.toggle_follow)
+        top_row2.addWidget(self.follow_checkbox)
+
         top_row2.addWidget(QLabel("Theme:"))
         self.theme_combo = QComboBox()
         self.theme_combo.addItems(
@@ -217,7 +283,6 @@ class MainWindow(QMainWindow):
         bottom_layout.addWidget(QLabel("My New ELO"), 1, 2)
         self.my_elo_spin = QSpinBox()
         self.my_elo_spin.setRange(0, 3000)
-        self.my_elo_spin.setValue(int(self.get_current_elo()["data"]["current_elo"]))
         bottom_layout.addWidget(self.my_elo_spin, 2, 2)
 
         bottom_layout.addWidget(QLabel("ELO Delta"), 1, 3)
@@ -230,7 +295,6 @@ class MainWindow(QMainWindow):
         bottom_layout.addWidget(QLabel("Name"), 3, 1)
         self.name_edit = QLineEdit()
         self.name_edit.setMinimumWidth(30)
-        self.name_edit.setCompleter(QCompleter(self.get_opponent_names()))
         bottom_layout.addWidget(self.name_edit, 3, 2, 1, 4)
 
         # Game sections
@@ -286,6 +350,8 @@ class MainWindow(QMainWindow):
         rivals_log_button.setFocusPolicy(Qt.NoFocus)
         ping_button.setFocusPolicy(Qt.NoFocus)
         self.debug_checkbox.setFocusPolicy(Qt.NoFocus)
+        self.all_logs_checkbox.setFocusPolicy(Qt.NoFocus)
+        self.follow_checkbox.setFocusPolicy(Qt.NoFocus)
         self.theme_combo.setFocusPolicy(Qt.NoFocus)
         self.output_text.setFocusPolicy(Qt.NoFocus)
         self.my_elo_spin.setFocusPolicy(Qt.NoFocus)
@@ -326,6 +392,7 @@ class MainWindow(QMainWindow):
                 self.name_edit,
                 self.theme_combo,
                 self.debug_checkbox,
+                self.all_logs_checkbox,
             ]
             + self.opp_combos
             + self.stage_combos
@@ -348,7 +415,9 @@ class MainWindow(QMainWindow):
             if widget == self.opp_elo_spin:
                 widget.setValue(STARTING_DEFAULT)
             elif widget == self.my_elo_spin:
-                widget.setValue(int(self.get_current_elo()["data"]["current_elo"]))
+                self.get_current_elo(
+                    lambda data: widget.setValue(int(data["data"]["current_elo"]))
+                )
             elif widget == self.change_elo_spin:
                 widget.setValue(0)
             elif widget in self.duration_spins:
@@ -582,206 +651,195 @@ class MainWindow(QMainWindow):
         dialog = PingDialog(self.ping_worker, self)
         dialog.show()
 
-    def get_final_move_top_list(self):
-        try:
-            res = requests.get(
-                f"http://{config.be_host}:{config.be_port}/movelist/top", timeout=10
-            )
-            res.raise_for_status()
-            return res.json()
-        except requests.exceptions.Timeout:
-            logger.error("Timeout fetching final move top list")
-            self.output_text.append(
-                "Error: Timeout fetching final move data from server."
-            )
-        except requests.exceptions.ConnectionError:
-            logger.error("Connection error fetching final move top list")
-            self.output_text.append(
-                "Error: Unable to connect to server for final move data."
-            )
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error fetching final move top list: {e}")
-            self.output_text.append(
-                "Error: Failed to fetch final move data from server."
-            )
-        return {"status": "FAIL", "data": []}
+    def run_request(self, fn, what, on_result, fallback=None):
+        """Run a backend call on the pool, reporting failures like the old blocking calls did"""
+
+        def failed(e):
+            if isinstance(e, requests.exceptions.Timeout):
+                logger.error(f"Timeout fetching {what}")
+                self.output_text.append(f"Error: Timeout fetching {what} from server.")
+            elif isinstance(e, requests.exceptions.ConnectionError):
+                logger.error(f"Connection error fetching {what}")
+                self.output_text.append(f"Error: Unable to connect to server for {what}.")
+            elif isinstance(e, requests.exceptions.RequestException):
+                logger.error(f"Request error fetching {what}: {e}")
+                self.output_text.append(f"Error: Failed to fetch {what} from server.")
+            else:
+                logger.error(f"Error fetching {what}: {e}")
+                self.output_text.append(f"Error: Failed to fetch {what}: {e}")
+            if fallback is not None:
+                on_result(fallback)
 
-    def get_current_elo(self):
-        try:
-            res = requests.get(
-                f"http://{config.be_host}:{config.be_port}/current_tier", timeout=10
-            )
-            res.raise_for_status()
-            return res.json()
-        except requests.exceptions.Timeout:
-            logger.error("Timeout fetching current ELO")
-            self.output_text.append("Error: Timeout fetching current ELO from server.")
-        except requests.exceptions.ConnectionError:
-            logger.error("Connection error fetching current ELO")
-            self.output_text.append(
-                "Error: Unable to connect to server for current ELO."
+        run_task(fn, on_result=on_result, on_error=failed)
+
+    def get_current_elo(self, on_result):
+        """Current ELO and game counts from the local logs, or the backend if they have none"""
+
+        def local_or_backend():
+            state = current_state(
+                os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log"),
+                tiers=cached_tiers(self.reference_cache),
             )
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error fetching current ELO: {e}")
-            self.output_text.append("Error: Failed to fetch current ELO from server.")
-        return {
-            "status": "FAIL",
-            "data": {
-                "current_elo": -2,
-                "tier": "N/A",
-                "tier_short": "N/A",
-                "last_game_number": -2,
-            },
-        }
+            return state.as_response() if state else get_json("/current_tier")
+
+        self.run_request(
+            local_or_backend,
+            "current ELO",
+            on_result,
+            fallback=CURRENT_ELO_FALLBACK,
+        )
 
     def refresh_top_row(self):
-        self.my_elo_spin.setValue(int(self.get_current_elo()["data"]["current_elo"]))
+        self.get_current_elo(self.set_current_elo)
         self.change_elo_spin.setValue(0)
 
+    def set_current_elo(self, data):
+        self.my_elo_spin.setValue(int(data["data"]["current_elo"]))
+        if data.get("status") == LOCAL_STATUS and not self.push_client.connected:
+            # Check the backend hasn't seen later games than the logs, the
+            # push channel sends tier_changed for that when it's up
+            self.run_request(
+                partial(get_json, "/current_tier"),
+                "current ELO",
+                lambda remote: self.reconcile_current_elo(data, remote),
+            )
+
+    def reconcile_current_elo(self, local, remote):
+        newest = reconcile(local, remote)
+        if newest is remote:
+            self.my_elo_spin.setValue(int(remote["data"]["current_elo"]))
+
     def get_match_times(self):
-        data = roll_up_durations([os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log")])
-        if not data["durations"]:
+        data = last_match_durations(os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log"))
+        if not data:
             return
-        last = data["durations"][list(data["durations"].keys())[-1]]["durations"]
-        for i, d in enumerate(self.duration_spins):
-            if i < len(last):
-                d.setValue(int(last[i]))
-            else:
-                d.setValue(-1)
-        if data["all_durations"]:
-            self.output_text.append(str(data["all_durations"]))
+        last = data[-1]["durations"]
+        self.set_durations(last)
+        if last:
+            self.output_text.append(str(last))
+
+    def refresh_opponent_names(self):
+        self.run_request(
+            partial(get_json, "/opponent_names"),
+            "opponent names",
+            lambda data: self.set_opponent_names(data["data"]["names"]),
+        )
 
-    def get_opponent_names(self):
-        try:
-            response = requests.get(
-                f"http://{config.be_host}:{config.be_port}/opponent_names", timeout=10
-            )
-            response.raise_for_status()
-            return response.json()["data"]["names"]
-        except requests.exceptions.Timeout:
-            logger.error("Timeout fetching opponent names")
-            self.output_text.append(
-                "Error: Timeout fetching opponent names from server."
-            )
-        except requests.exceptions.ConnectionError:
-            logger.error("Connection error fetching opponent names")
-            self.output_text.append(
-                "Error: Unable to connect to server for opponent names."
-            )
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error fetching opponent names: {e}")
-            self.output_text.append(
-                "Error: Failed to fetch opponent names from server."
-            )
-        return []
+    def set_opponent_names(self, names):
+        self.opponent_names = list(names)
+        self.name_edit.setCompleter(QCompleter(self.opponent_names))
 
-    def populate_dropdowns(self):
-        stages1 = {}
-        character_names = []
-        stage_names = []
-        move_names = []
-        characters_json = {"data": []}
-        stage_json = {"data": []}
-        moves_json = {"data": []}
+    def on_opponent_names_changed(self, added, removed):
+        removed = set(removed)
+        names = [x for x in getattr(self, "opponent_names", []) if x not in removed]
+        self.set_opponent_names(names + [x for x in added if x not in names])
 
-        try:
-            response = requests.get(
-                f"http://{config.be_host}:{config.be_port}/characters", timeout=10
-            )
-            response.raise_for_status()
-            characters_json = response.json()
-            for char in characters_json["data"]:
-                characters[char["display_name"]] = char["id"]
-                if char["id"] == -1:
-                    characters["sepior1"] = -1
-            character_names = list(characters.keys())
-        except requests.exceptions.Timeout:
-            self.output_text.append(
-                "Error: Timeout fetching character data from server."
-            )
-            logger.error("Timeout fetching characters")
-        except requests.exceptions.ConnectionError:
-            self.output_text.append(
-                "Error: Unable to connect to server for character data."
-            )
-            logger.error("Connection error fetching characters")
-        except requests.exceptions.RequestException as e:
-            self.output_text.append(
-                "Error: Failed to fetch character data from server."
-            )
-            logger.error(f"Request error fetching characters: {e}")
+    def on_tier_changed(self, data):
+        self.get_current_elo(
+            lambda local: self.reconcile_current_elo(local, {"status": "PUSH", "data": data})
+        )
 
-        try:
-            response = requests.get(
-                f"http://{config.be_host}:{config.be_port}/stages", timeout=10
-            )
-            response.raise_for_status()
-            stage_json = response.json()
-
-            # Filter for stages available in ranked singles
-            ranked_stages = []
-            for stage in stage_json["data"]:
-                if stage.get("ranked_singles", 0) and stage["stage_type"] != "Doubles":
-                    ranked_stages.append(stage)
-
-            # Sort stages by list_order (None values treated as high numbers to appear at end)
-            ranked_stages.sort(key=lambda x: x.get("list_order", 999))
-
-            # Build stage dictionaries for UI
-            counter = -1
-            for stage in ranked_stages:
-                if counter == -1 and stage["counter_pick"] == -1:
-                    stages1[stage["display_name"]] = stage["id"]
-                if counter == -1 and stage["counter_pick"] == 0:
-                    stages["sepior1"] = -1
-                    stages1["sepior1"] = -1
-                if stage["counter_pick"] == 0:
-                    counter = 0
-                    stages1[stage["display_name"]] = stage["id"]
-                if counter == 0 and stage["counter_pick"] == 1:
-                    stages["sepior2"] = -1
-                    counter = 1
-                stages[stage["display_name"]] = stage["id"]
-            stage_names = list(stages.keys())
-        except requests.exceptions.Timeout:
-            self.output_text.append("Error: Timeout fetching stage data from server.")
-            logger.error("Timeout fetching stages")
-        except requests.exceptions.ConnectionError:
-            self.output_text.append(
-                "Error: Unable to connect to server for stage data."
-            )
-            logger.error("Connection error fetching stages")
-        except requests.exceptions.RequestException as e:
-            self.output_text.append("Error: Failed to fetch stage data from server.")
-            logger.error(f"Request error fetching stages: {e}")
+    def on_match_inserted(self, match):
+        logger.info(f"Backend stored match {match.get('ranked_game_number')}")
 
-        try:
-            response = requests.get(
-                f"http://{config.be_host}:{config.be_port}/movelist", timeout=10
+    def on_reference_changed(self, path):
+        if path not in REFERENCE_PATHS:
+            return
+        self.reference_waiting.add(path)
+        self.run_request(
+            partial(self.reference_cache.refresh, path, True),
+            REFERENCE_NAMES[path],
+            partial(self.on_reference_refreshed, path),
+            fallback=(self.reference_cache.get(path), False),
+        )
+
+    def on_push_connection_changed(self, connected):
+        if connected:
+            # Catch up on anything missed while disconnected, deltas follow
+            self.refresh_opponent_names()
+            self.refresh_top_row()
+
+    def load_reference_data(self):
+        """Fill the dropdowns from the local cache, then revalidate it in the background"""
+        cached = {x: self.reference_cache.get(x) for x in REFERENCE_PATHS}
+        if any(x is not None for x in cached.values()):
+            self.populate_dropdowns(cached)
+        self.reference_tables = cached
+        self.reference_changed = False
+        self.reference_waiting = set(REFERENCE_PATHS)
+        # All tables revalidate at once, a failed one keeps its cached copy
+        for path in REFERENCE_PATHS:
+            self.run_request(
+                partial(self.reference_cache.refresh, path),
+                REFERENCE_NAMES[path],
+                partial(self.on_reference_refreshed, path),
+                fallback=(cached[path], False),
             )
-            response.raise_for_status()
-            moves_json = response.json()
-            sorted_moves = sorted(moves_json["data"], key=lambda x: x["list_order"])
-            top_moves_list = [
-                x["final_move_name"] for x in self.get_final_move_top_list()["data"]
-            ]
-            for move in sorted_moves:
-                display_name = move["display_name"]
-                if display_name in top_moves_list:
-                    display_name += " *"
-                moves[display_name] = move["id"]
-                if move["id"] == -1:
-                    moves["sepior"] = -1
-            move_names = list(moves.keys())
-        except requests.exceptions.Timeout:
-            self.output_text.append("Error: Timeout fetching move data from server.")
-            logger.error("Timeout fetching moves")
-        except requests.exceptions.ConnectionError:
-            self.output_text.append("Error: Unable to connect to server for move data.")
-            logger.error("Connection error fetching moves")
-        except requests.exceptions.RequestException as e:
-            self.output_text.append("Error: Failed to fetch move data from server.")
-            logger.error(f"Request error fetching moves: {e}")
+
+    def on_reference_refreshed(self, path, result):
+        self.reference_tables[path], changed = result
+        self.reference_changed = self.reference_changed or changed
+        self.reference_waiting.discard(path)
+        # Only rebuild the dropdowns when the backend's data actually changed
+        if not self.reference_waiting and self.reference_changed:
+            self.reference_changed = False
+            self.populate_dropdowns(self.reference_tables)
+
+    def populate_dropdowns(self, reference):
+        stages1 = {}
+        characters_json = reference.get("/characters") or {"data": []}
+        stage_json = reference.get("/stages") or {"data": []}
+        moves_json = reference.get("/movelist") or {"data": []}
+        top_json = reference.get("/movelist/top") or {"data": []}
+        # A background refresh can land after the user picked things
+        combos = self.opp_combos + self.stage_combos + self.move_combos
+        selected = [x.currentText() for x in combos]
+        characters.clear()
+        stages.clear()
+        moves.clear()
+
+        for char in characters_json["data"]:
+            characters[char["display_name"]] = char["id"]
+            if char["id"] == -1:
+                characters["sepior1"] = -1
+        character_names = list(characters.keys())
+
+        # Filter for stages available in ranked singles
+        ranked_stages = []
+        for stage in stage_json["data"]:
+            if stage.get("ranked_singles", 0) and stage["stage_type"] != "Doubles":
+                ranked_stages.append(stage)
+
+        # Sort stages by list_order (None values treated as high numbers to appear at end)
+        ranked_stages.sort(key=lambda x: x.get("list_order", 999))
+
+        # Build stage dictionaries for UI
+        counter = -1
+        for stage in ranked_stages:
+            if counter == -1 and stage["counter_pick"] == -1:
+                stages1[stage["display_name"]] = stage["id"]
+            if counter == -1 and stage["counter_pick"] == 0:
+                stages["sepior1"] = -1
+                stages1["sepior1"] = -1
+            if stage["counter_pick"] == 0:
+                counter = 0
+                stages1[stage["display_name"]] = stage["id"]
+            if counter == 0 and stage["counter_pick"] == 1:
+                stages["sepior2"] = -1
+                counter = 1
+            stages[stage["display_name"]] = stage["id"]
+        stage_names = list(stages.keys())
+
+        sorted_moves = sorted(moves_json["data"], key=lambda x: x["list_order"])
+        top_moves_list = [x["final_move_name"] for x in top_json["data"]]
+        for move in sorted_moves:
+            display_name = move["display_name"]
+            if display_name in top_moves_list:
+                display_name += " *"
+            moves[display_name] = move["id"]
+            if move["id"] == -1:
+                moves["sepior"] = -1
+        move_names = list(moves.keys())
 
         ranked_stages_count = len(
             [
@@ -815,6 +873,10 @@ class MainWindow(QMainWindow):
                 combo.insertSeparator(idx)
                 combo.removeItem(idx + 1)
 
+        for combo, text in zip(combos, selected):
+            if combo.findText(text) >= 0:
+                combo.setCurrentText(text)
+
     def are_required_dropdowns_filled(self):
         for game in range(3):
             opp = self.opp_combos[game].currentText().strip()
@@ -850,7 +912,9 @@ class MainWindow(QMainWindow):
         self.opp_elo_spin.setValue(STARTING_DEFAULT)
 
     def generate_json(self):
-        elo_values = self.get_current_elo()
+        self.get_current_elo(self.copy_json)
+
+    def copy_json(self, elo_values):
         jsond = {}
         jsond["match_date"] = (
             datetime.now(timezone.utc)
@@ -862,17 +926,27 @@ class MainWindow(QMainWindow):
         jsond["elo_rank_old"] = jsond["elo_rank_new"] - jsond["elo_change"]
         jsond["match_win"] = 1 if jsond["elo_change"] >= 0 else 0
         jsond["match_forfeit"] = -1
-        jsond["ranked_game_number"] = int(elo_values["data"]["last_game_number"]) + 1
-        jsond["total_wins"] = (
-            int(elo_values["data"]["total_wins"]) + 1
-            if jsond["match_win"]
-            else int(elo_values["data"]["total_wins"])
-        )
-        jsond["win_streak_value"] = (
-            int(elo_values["data"]["win_streak_value"]) + 1
-            if jsond["match_win"]
-            else int(elo_values["data"]["win_streak_value"])
-        )
+        if (
+            elo_values.get("status") == LOCAL_STATUS
+            and elo_values["data"]["current_elo"] == jsond["elo_rank_new"]
+            and elo_values["data"]["elo_change"] == jsond["elo_change"]
+        ):
+            # The match on screen is the last one in the log, use its numbers
+            jsond["ranked_game_number"] = int(elo_values["data"]["last_game_number"])
+            jsond["total_wins"] = int(elo_values["data"]["total_wins"])
+            jsond["win_streak_value"] = int(elo_values["data"]["win_streak_value"])
+        else:
+            jsond["ranked_game_number"] = int(elo_values["data"]["last_game_number"]) + 1
+            jsond["total_wins"] = (
+                int(elo_values["data"]["total_wins"]) + 1
+                if jsond["match_win"]
+                else int(elo_values["data"]["total_wins"])
+            )
+            jsond["win_streak_value"] = (
+                int(elo_values["data"]["win_streak_value"]) + 1
+                if jsond["match_win"]
+                else int(elo_values["data"]["win_streak_value"])
+            )
         jsond["opponent_elo"] = self.opp_elo_spin.value()
         jsond["opponent_name"] = self.name_edit.text() or ""
         for x in range(3):
@@ -902,9 +976,10 @@ class MainWindow(QMainWindow):
 
         jsond["final_move_id"] = get_final_move_id(jsond)
         jsond["notes"] = "Added via JSON lol"
-        logger.debug(json.dumps(jsond))
+        payload = serialize.dumps(jsond, indent=True).decode()
+        logger.debug(payload)
         clipboard = QApplication.clipboard()
-        clipboard.setText(json.dumps(jsond, indent=4))
+        clipboard.setText(payload)
 
     def paste_json(self):
         clipboard = QApplication.clipboard()
@@ -944,10 +1019,11 @@ class MainWindow(QMainWindow):
         payload = {
             "opponent_name": opponent_name
         }
-        requests.post(
-            f"http://{config.be_host}:{config.be_port}/ui_user_lookup",
+        run_task(
+            backend.post,
+            "/ui_user_lookup",
             json=payload,
-            timeout=10
+            on_error=lambda e: logger.error(f"User lookup for {opponent_name} failed: {e}"),
         )
 
     def run_parser(self):
@@ -1011,7 +1087,11 @@ class MainWindow(QMainWindow):
             "final_move_id": -1,
         }
         self.extra_data = extra_data
-        self.worker = ParserWorker(self.debug_checkbox.isChecked(), extra_data)
+        self.worker = ParserWorker(
+            self.debug_checkbox.isChecked(),
+            extra_data,
+            self.all_logs_checkbox.isChecked(),
+        )
         self.worker.finished.connect(self.on_parser_finished)
         self.worker.error.connect(self.on_parser_error)
         self.worker.start()
@@ -1021,15 +1101,63 @@ class MainWindow(QMainWindow):
             self.output_text.append("No matches found or no new matches to add.")
         else:
             self.output_text.append(
-                f"Log parsed. Added {len(result)} match{'es' if len(result) != 1 else ''}: {','.join(f'{str(x.elo_rank_new)}({str(x.elo_change)})' for x in result) if result else ''}"
+                f"Log parsed. Queued {len(result)} game{'s' if len(result) != 1 else ''} to check and send: {','.join(f'{str(x.elo_rank_new)}({str(x.elo_change)})' for x in result) if result else ''}"
             )
         # Log GUI selections and ranked game numbers for recovery
         logger.info("Parsed match GUI data:", self.extra_data)
         for match in result:
             logger.info("Ranked game number:", match.ranked_game_number)
         self.run_button.setEnabled(True)
+        # The drainer checks and posts what was just queued
+        self.outbox_drainer.wake()
+        self.refresh_top_row()
+        if not self.push_client.connected:
+            self.refresh_opponent_names()
+        self.push_client.send(
+            "matches_parsed",
+            {"ranked_game_numbers": [x.ranked_game_number for x in result]},
+        )
+
+    def on_outbox_sent(self, ranked_game_numbers):
+        self.output_text.append(
+            f"Sent queued match{'es' if len(ranked_game_numbers) != 1 else ''}: {','.join(str(x) for x in ranked_game_numbers)}"
+        )
         self.refresh_top_row()
-        self.name_edit.setCompleter(QCompleter(self.get_opponent_names()))
+
+    def toggle_follow(self, checked):
+        if checked:
+            self.log_watcher = LogWatcher(os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log"))
+            self.log_watcher.match_finished.connect(self.on_match_finished)
+            self.log_watcher.durations_updated.connect(self.set_durations)
+            self.log_watcher.error.connect(self.on_parser_error)
+            self.log_watcher.start()
+            self.output_text.append("Following Rivals2.log")
+        elif hasattr(self, "log_watcher"):
+            self.log_watcher.stop()
+            self.log_watcher.wait()
+            del self.log_watcher
+            self.output_text.append("Stopped following Rivals2.log")
+
+    def on_match_finished(self, update, durations):
+        self.my_elo_spin.setValue(update.elo_rank_new)
+        self.change_elo_spin.setValue(update.elo_change)
+        self.set_durations(durations)
+        self.output_text.append(
+            f"Set {update.ranked_game_number} finished: {update.elo_rank_new}({update.elo_change})"
+        )
+        self.push_client.send(
+            "set_finished",
+            {
+                "ranked_game_number": update.ranked_game_number,
+                "elo_rank_new": update.elo_rank_new,
+                "elo_change": update.elo_change,
+                "durations": list(durations),
+            },
+        )
+
+    def set_durations(self, durations):
+        for i, d in enumerate(self.duration_spins):
+            d.setValue(int(durations[i]) if i < len(durations) else -1)
 
     def on_parser_error(self, error_msg):
         self.output_text.append(f"Error: {error_msg}")
@@ -1040,6 +1168,8 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Backfill parsing uses a process pool, which needs this in the frozen exe
+    multiprocessing.freeze_support()
     logger = setup_logging()
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("icon.png"))
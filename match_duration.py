@@ -1,82 +1,145 @@
-import re
-duration_re = re.compile(r'RivalsCharacterXpEndMatchReportMessage::OnReceivedFromServer LocalPlayerIndex 0, matchDuration (\d+)')
-rank_update_re = re.compile(r'URivalsRankUpdateMessage::OnReceivedFromServer .*: .*?, .*?, .*?, (\d+),')
+import os
+from collections import deque
+from typing import Iterable, Iterator
+
+from utils.scanner import (
+    RANK_UPDATE_MARKER,
+    LogEvent,
+    MatchDuration,
+    RankUpdate,
+    scan_files,
+    scan_lines,
+)
+from utils.tail import TailReader
+
+# Durations up to this many lines after a rank update belong to that match
+LOOKAHEAD_LINES = 5
+MAX_GAMES = 3
+# Block size when reading the log backwards for the last few matches
+BACKWARD_BLOCK = 1 << 20
+
+
+def add_duration(durations: list, duration: int):
+    # Deduplicate consecutive duplicates, anything past the cap is never used
+    if len(durations) < MAX_GAMES and (not durations or durations[-1] != duration):
+        durations.append(duration)
+
+
+def _duration_record(update: RankUpdate, prior: list, trailing) -> dict:
+    cleaned = prior[:]
+    if trailing is not None:
+        add_duration(cleaned, trailing)
+    return {
+        "ranked_game_number": update.ranked_game_number,
+        "new_elo": update.elo_rank_new,
+        "old_elo": update.elo_rank_old,
+        "delta": update.elo_change,
+        "charxp": update.total_wins,
+        "unknown": update.win_streak_value,
+        "durations": cleaned,
+    }
+
+
+def iter_match_durations(events: Iterable[LogEvent], all_durations: list = None) -> Iterator[dict]:
+    """Yield the game durations of each match as soon as they are known.
+
+    Durations logged since the previous rank update belong to the next one,
+    plus at most one trailing duration within LOOKAHEAD_LINES after it. A
+    match is held back only until that window closes, so memory doesn't grow
+    with the log. Every duration seen is also appended to all_durations.
+    """
+    durations = []
+    # [update, durations before it, trailing duration] waiting on their window
+    pending = deque()
+    for event in events:
+        if isinstance(event, MatchDuration):
+            taken = False
+            for waiting in pending:
+                update = waiting[0]
+                if (
+                    waiting[2] is None
+                    and event.file == update.file
+                    and event.line_no - update.line_no <= LOOKAHEAD_LINES
+                ):
+                    waiting[2] = event.duration
+                    taken = True
+                    if all_durations is not None:
+                        all_durations.append(event.duration)
+            if not taken:
+                add_duration(durations, event.duration)
+                if all_durations is not None:
+                    all_durations.append(event.duration)
+        elif isinstance(event, RankUpdate):
+            pending.append([event, durations, None])
+            durations = []
+        else:
+            continue
+        while pending:
+            update, prior, trailing = pending[0]
+            if trailing is None and (
+                event.file == update.file
+                and event.line_no - update.line_no <= LOOKAHEAD_LINES
+            ):
+                break
+            pending.popleft()
+            yield _duration_record(update, prior, trailing)
+    while pending:
+        yield _duration_record(*pending.popleft())
+
 
 def roll_up_durations(files: list) -> dict:
+    return roll_up_events(scan_files(files))
+
+
+def roll_up_events(events: Iterable[LogEvent]) -> dict:
     # Only match RivalsCharacterXpEndMatchReportMessage durations and RankUpdate summaries
-    duration_re = re.compile(
-        r"RivalsCharacterXpEndMatchReportMessage::OnReceivedFromServer LocalPlayerIndex 0, matchDuration (\d+)"
-    )
-    rank_update_re = re.compile(
-        r"URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex 0: (\d+), (\d+), (-?\d+), (\d+), (\d+), (\d+)"
-    )
     results = {}
     results["all_durations"] = []
     results["durations"] = {}
-    durations = []
-    unchanged_durations = []
-    skip_index = None  # remember which line index we already used as a trailing duration
-    for file in files:
-        with open(file, 'r') as f:
-            lines = f.readlines()
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-
-                # Skip a trailing duration line that was already consumed for previous match
-                if i == skip_index:
-                    i += 1
-                    continue
-
-                m_d = duration_re.search(line)
-                if m_d:
-                    durations.append(int(m_d.group(1)))
-                    i += 1
-                    results["all_durations"].append(int(m_d.group(1)))
-
-                    continue
-
-                m_r = rank_update_re.search(line)
-                if m_r:
-                    new_elo, old_elo, delta, match_id, charxp, unknown = map(int, m_r.groups())
-
-                    # Look ahead for one trailing duration belonging to this match
-                    lookahead_duration = None
-                    for j in range(1, 6):
-                        if i + j < len(lines):
-                            next_line = lines[i + j]
-                            m_next = duration_re.search(next_line)
-                            if m_next:
-                                lookahead_duration = int(m_next.group(1))
-                                results["all_durations"].append(int(m_next.group(1)))
-                                skip_index = i + j  # mark this duration line as used
-                                break
-
-                    combined = durations[:]
-                    if lookahead_duration is not None:
-                        combined.append(lookahead_duration)
-
-                    # Deduplicate consecutive duplicates
-                    cleaned = []
-                    for d in combined:
-                        if not cleaned or d != cleaned[-1]:
-                            cleaned.append(d)
-                    cleaned = cleaned[:3]  # cap at 3 games
-                    results["durations"][match_id] = {}
-                    results["durations"][match_id] = {
-                        "new_elo": new_elo,
-                        "old_elo": old_elo,
-                        "delta": delta,
-                        "charxp": charxp,
-                        "unknown": unknown,
-                        "durations": cleaned,
-                    }
-                    
-                    # Reset for next match
-                    durations.clear()
-                i += 1
+    for record in iter_match_durations(events, results["all_durations"]):
+        match_id = record.pop("ranked_game_number")
+        results["durations"][match_id] = record
     return results
 
+
+def _nth_rank_update_from_end(path: str, count: int) -> int:
+    """Offset of the line holding the count-th last rank update, 0 if there are fewer"""
+    marker = RANK_UPDATE_MARKER.encode()
+    found = 0
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        overlap = b""
+        while pos > 0:
+            start = max(0, pos - BACKWARD_BLOCK)
+            f.seek(start)
+            block = f.read(pos - start) + overlap
+            hit = len(block)
+            while True:
+                hit = block.rfind(marker, 0, hit)
+                if hit == -1:
+                    break
+                found += 1
+                if found == count:
+                    hit += start
+                    f.seek(max(0, hit - 4096))
+                    before = f.read(hit - max(0, hit - 4096))
+                    return max(0, hit - 4096) + before.rfind(b"\n") + 1
+            overlap = block[: len(marker) - 1]
+            pos = start
+    return 0
+
+
+def last_match_durations(path: str, count: int = 1) -> list[dict]:
+    """Durations of the last count matches, reading only the end of the log.
+
+    Scanning starts at the rank update before the first wanted match, so the
+    durations in between are attributed the same way as a full read.
+    """
+    start = _nth_rank_update_from_end(path, count + 1)
+    records = list(iter_match_durations(scan_lines(TailReader(path, offset=start), path)))
+    return records[-count:]
+
+
 def main():
     matches = {}
     files = [os.path.join(RIVALS_LOG_FOLDER, "Rivals2.log")]
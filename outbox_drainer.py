@@ -0,0 +1,58 @@
+import threading
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+import log_parser
+from utils.log import setup_logging
+from utils.outbox import Outbox
+
+logger = setup_logging()
+
+# Longest sleep between looks at the outbox
+DRAIN_INTERVAL = 30.0
+
+
+class OutboxDrainer(QThread):
+    """Retry queued match posts in the background until the backend has them.
+
+    Sleeps until the earliest queued retry is due, or until wake() is called
+    after a parse queued something new.
+    """
+
+    sent = Signal(list)
+    error = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._running = True
+        self._wake = threading.Event()
+
+    def run(self):
+        # sqlite connections stay on the thread that opened them
+        outbox = Outbox()
+        try:
+            while self._running:
+                try:
+                    sent, left = log_parser.drain_outbox(outbox)
+                    if sent:
+                        logger.info(f"Outbox: sent {sent}, {left} still queued")
+                        self.sent.emit(sent)
+                except Exception as e:
+                    logger.error(f"Error draining outbox: {e}")
+                    self.error.emit(str(e))
+                next_attempt = outbox.next_attempt()
+                timeout = DRAIN_INTERVAL
+                if next_attempt is not None:
+                    timeout = min(max(next_attempt - time.time(), 0.5), DRAIN_INTERVAL)
+                self._wake.wait(timeout)
+                self._wake.clear()
+        finally:
+            outbox.close()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
@@ -0,0 +1,122 @@
+import json
+import queue
+import threading
+
+from PySide6.QtCore import QThread, Signal
+from websockets.exceptions import WebSocketException
+from websockets.sync.client import connect
+
+from config import Config
+from utils.log import setup_logging
+
+config = Config()
+
+logger = setup_logging()
+
+PUSH_URL = f"ws://{config.ws_host}:{config.ws_port}/"
+# Seconds between reconnect attempts, doubled per failure up to RECONNECT_MAX
+RECONNECT_BASE = 1.0
+RECONNECT_MAX = 30.0
+# How long a recv waits before queued outgoing events get sent
+SEND_INTERVAL = 0.2
+# Longest a connect attempt can hold up stop()
+OPEN_TIMEOUT = 2.0
+
+
+class PushClient(QThread):
+    """Backend push channel over a WebSocket.
+
+    Messages both ways are JSON objects {"type": ..., "data": ...}. Incoming
+    types are match_inserted (the stored match), tier_changed (the
+    /current_tier data), reference_changed ({"path": "/stages"}) and
+    opponent_names ({"added": [...], "removed": [...]}). Outgoing parser
+    events are queued with send() and go out whenever the socket is up.
+    """
+
+    match_inserted = Signal(dict)
+    tier_changed = Signal(dict)
+    reference_changed = Signal(str)
+    opponent_names_changed = Signal(list, list)
+    connection_changed = Signal(bool)
+
+    def __init__(self, url: str = PUSH_URL, parent=None):
+        super().__init__(parent)
+        self.url = url
+        self.connected = False
+        self._running = True
+        self._stopped = threading.Event()
+        self._ws = None
+        self._outgoing = queue.Queue()
+
+    def run(self):
+        delay = RECONNECT_BASE
+        while self._running:
+            try:
+                with connect(self.url, open_timeout=OPEN_TIMEOUT) as ws:
+                    self._ws = ws
+                    if not self._running:
+                        break
+                    delay = RECONNECT_BASE
+                    self._set_connected(True)
+                    logger.info(f"Connected to push channel {self.url}")
+                    self._serve(ws)
+            except (OSError, TimeoutError, WebSocketException) as e:
+                if self.connected and self._running:
+                    logger.warning(f"Push channel lost: {e}")
+                else:
+                    logger.debug(f"Push channel unavailable: {e}")
+            self._ws = None
+            self._set_connected(False)
+            # stop() cuts the backoff short
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, RECONNECT_MAX)
+        self._ws = None
+        self._set_connected(False)
+
+    def _serve(self, ws):
+        while self._running:
+            while not self._outgoing.empty():
+                ws.send(json.dumps(self._outgoing.get_nowait()))
+            try:
+                message = ws.recv(timeout=SEND_INTERVAL)
+            except TimeoutError:
+                continue
+            self.handle_message(message)
+
+    def handle_message(self, message: str):
+        try:
+            event = json.loads(message)
+            kind = event["type"]
+            data = event.get("data") or {}
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Bad push message {message!r}: {e}")
+            return
+        if kind == "match_inserted":
+            self.match_inserted.emit(data)
+        elif kind == "tier_changed":
+            self.tier_changed.emit(data)
+        elif kind == "reference_changed":
+            self.reference_changed.emit(data.get("path", ""))
+        elif kind == "opponent_names":
+            self.opponent_names_changed.emit(data.get("added", []), data.get("removed", []))
+        else:
+            logger.debug(f"Ignoring push message type {kind}")
+
+    def _set_connected(self, connected: bool):
+        if connected != self.connected:
+            self.connected = connected
+            self.connection_changed.emit(connected)
+
+    def send(self, kind: str, data: dict):
+        """Queue a parser event for the backend, dropped while disconnected"""
+        if self.connected:
+            self._outgoing.put({"type": kind, "data": data})
+
+    def stop(self):
+        self._running = False
+        self._stopped.set()
+        ws = self._ws
+        if ws is not None:
+            # Wakes a recv blocked in _serve with ConnectionClosed
+            ws.close()
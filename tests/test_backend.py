@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+import requests
+
+from devserver.backend import StandInBackend
+from utils import backend
+from utils.match import Match
+
+
+class Reply:
+    """Just enough of a requests.Response for the bulk routes"""
+
+    def __init__(self, body, status_code: int = 200):
+        self.body = body
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code}")
+
+    def json(self):
+        return self.body
+
+
+def match(number: int) -> Match:
+    return Match(match_date=datetime(2025, 1, 1), elo_change=10, ranked_game_number=number)
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = StandInBackend().start()
+    monkeypatch.setattr(backend, "BASE_URL", server.url)
+    monkeypatch.setattr(backend, "_bulk_exists_supported", True)
+    monkeypatch.setattr(backend, "_bulk_insert_supported", True)
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("body", [{"data": None}, {"data": []}, {"data": {"existing": None}}, None])
+def test_existing_matches_falls_back_on_a_malformed_reply(monkeypatch, stand_in, body):
+    stand_in._insert({"ranked_game_number": 2})
+    monkeypatch.setattr(backend, "post", lambda *args, **kwargs: Reply(body))
+    assert backend.existing_matches([1, 2, 3]) == {2}
+    assert stand_in.requests["GET /match-exists"] == 3
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.ConnectionError, requests.exceptions.Timeout])
+def test_existing_matches_raises_when_the_backend_is_unreachable(monkeypatch, stand_in, error):
+    def unreachable(*args, **kwargs):
+        raise error("backend down")
+
+    monkeypatch.setattr(backend, "post", unreachable)
+    with pytest.raises(error):
+        backend.existing_matches([1, 2, 3])
+    assert "GET /match-exists" not in stand_in.requests
+
+
+def test_existing_matches_in_one_request(stand_in):
+    stand_in._insert({"ranked_game_number": 2})
+    assert backend.existing_matches([3, 2, 1, 2]) == {2}
+    assert stand_in.requests == {"POST /match-exists/bulk": 1}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [{"data": {"results": [{"status": "SUCCESS"}]}}, {"data": {"results": [None]}}, {"data": {"results": [{"ranked_game_number": "x"}]}}],
+)
+def test_insert_matches_fails_the_chunk_on_malformed_rows(monkeypatch, stand_in, body):
+    matches = [match(1), match(2)]
+    monkeypatch.setattr(backend, "post", lambda *args, **kwargs: Reply(body))
+    results = backend.insert_matches(matches)
+    assert sorted(results) == [1, 2]
+    assert all("Failed to post" in x["error"] for x in results.values())
+
+
+def test_insert_matches_reports_each_row(stand_in):
+    stand_in._insert({"ranked_game_number": 2})
+    results = backend.insert_matches([match(1), match(2)])
+    assert "error" not in results[1]
+    assert results[2]["error"] == "match already exists"
+
+
+def test_each_thread_has_its_own_session():
+    barrier = threading.Barrier(4)
+
+    def thread_session(_):
+        # Keeps all four threads alive at once, so none is reused
+        barrier.wait(5)
+        return backend.session()
+
+    with ThreadPoolExecutor(4) as pool:
+        sessions = list(pool.map(thread_session, range(4)))
+    assert len({id(x) for x in sessions}) == 4
+    assert backend.session() is backend.session()
+    assert backend.session() not in sessions
+    assert {id(x.get_adapter(backend.BASE_URL)) for x in sessions} == {id(backend._adapter)}
+
+
+def test_later_threads_reuse_connections(stand_in):
+    def lookups():
+        barrier = threading.Barrier(4)
+
+        def thread_get(_):
+            barrier.wait(5)
+            return backend.get("/characters").status_code
+
+        # Fresh threads each time, like one drain after another
+        with ThreadPoolExecutor(4) as pool:
+            assert list(pool.map(thread_get, range(4))) == [200] * 4
+
+    lookups()
+    pool = backend._adapter.poolmanager.connection_from_url(stand_in.url)
+    opened = pool.num_connections
+    lookups()
+    assert pool.num_connections == opened
+
+
+@pytest.mark.parametrize("retry_time, attempts", [(0.1, 2), (60, backend.RETRIES + 1)])
+def test_get_retries_stop_after_retry_time(monkeypatch, retry_time, attempts):
+    server = StandInBackend(latency=0.2, failure_rate=1.0).start()
+    monkeypatch.setattr(backend, "BASE_URL", server.url)
+    monkeypatch.setattr(backend, "RETRY_TIME", retry_time)
+    try:
+        assert backend.get("/characters").status_code == 503
+        assert server.requests["GET /characters"] == attempts
+    finally:
+        server.stop()
@@ -0,0 +1,53 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.backfill import scan_logs
+from utils.log import worker_log_queue, worker_logging
+from utils.scanner import RankUpdate
+
+LINE = "[2025.01.01-20.{:02d}.00:000][  0]LogRivals: URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex 0: {}, 1000, {}, {}, 1, 1\n"
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def log_from_worker(n: int) -> list[str]:
+    logging.getLogger().warning(f"worker {n}")
+    return [type(x).__name__ for x in logging.getLogger().handlers]
+
+
+def test_workers_log_through_the_main_process():
+    collect = Collect()
+    root = logging.getLogger()
+    root.addHandler(collect)
+    try:
+        with worker_log_queue() as queue:
+            with ProcessPoolExecutor(2, initializer=worker_logging, initargs=(queue,)) as pool:
+                handlers = list(pool.map(log_from_worker, range(4)))
+    finally:
+        root.removeHandler(collect)
+    assert handlers == [["QueueHandler"]] * 4
+    assert sorted(x.getMessage() for x in collect.records if x.getMessage().startswith("worker")) == [
+        f"worker {n}" for n in range(4)
+    ]
+
+
+def test_scan_logs_in_a_pool_and_from_the_cache(tmp_path):
+    files = []
+    for i in range(3):
+        path = os.path.join(tmp_path, f"Rivals2-backup-{i}.log")
+        with open(path, "w") as f:
+            f.write(LINE.format(i, 1000 + i, i, i + 1))
+        files.append(path)
+    cache_file = os.path.join(tmp_path, "parsed_logs.json")
+    events = scan_logs(files, workers=2, cache_file=cache_file)
+    cached = scan_logs(files, workers=2, cache_file=cache_file)
+    assert [x.ranked_game_number for x in events if isinstance(x, RankUpdate)] == [1, 2, 3]
+    assert cached == events
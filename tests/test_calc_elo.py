@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.calc_elo import INCONSISTENT_ESTIMATE, estimate_opponent_elo, estimate_opponent_elo_batch
+from utils.match_table import MatchTable
+
+
+def scalar(my_elo, elo_change, result, opponent_elo, k=24.0) -> tuple[list[int], list[bool]]:
+    estimates = []
+    inconsistent = []
+    for row in zip(my_elo, elo_change, result, opponent_elo):
+        try:
+            estimates.append(estimate_opponent_elo(*row, k=k))
+            inconsistent.append(False)
+        except ValueError:
+            estimates.append(INCONSISTENT_ESTIMATE)
+            inconsistent.append(True)
+    return estimates, inconsistent
+
+
+def assert_parity(rows, k=24.0):
+    expected, expected_mask = scalar(*rows, k=k)
+    estimates, mask = estimate_opponent_elo_batch(*[np.array(x) for x in rows], k=k)
+    assert estimates.dtype == np.int64
+    assert estimates.tolist() == expected
+    assert mask.tolist() == expected_mask
+
+
+def test_random_rows_match_scalar():
+    rng = random.Random(5)
+    count = 5000
+    my_elo = [rng.randint(0, 2200) for _ in range(count)]
+    elo_change = [rng.randint(-130, 130) for _ in range(count)]
+    result = [int(x >= 0) if rng.random() > 0.05 else int(x < 0) for x in elo_change]
+    opponent_elo = [rng.choice((-2, 1000, rng.randint(200, 2200))) for _ in range(count)]
+    assert_parity((my_elo, elo_change, result, opponent_elo))
+
+
+@pytest.mark.parametrize("k", [24.0, 40.0, 120.0])
+def test_changes_past_k_hit_the_clamp(k):
+    # |change| >= k puts the expected score outside (0, 1) before clamping
+    changes = [int(k), int(k) + 1, 500, -int(k), -int(k) - 1, -500, 0]
+    rows = ([1000] * len(changes), changes, [int(x >= 0) for x in changes], [1000] * len(changes))
+    assert_parity(rows, k=k)
+    estimates, _ = estimate_opponent_elo_batch(*[np.array(x) for x in rows], k=k)
+    assert np.isfinite(estimates).all()
+
+
+def test_unranked_opponent_uses_postplacement_k():
+    rows = ([1200, 1200, 1200], [30, 30, -30], [1, 1, 0], [-2, 1000, -2])
+    assert_parity(rows)
+    estimates, _ = estimate_opponent_elo_batch(*[np.array(x) for x in rows])
+    # Same change, the -2 row divides by K 40 instead of 24
+    assert estimates[0] != estimates[1]
+
+
+def test_inconsistent_rows_are_masked_not_raised():
+    rows = ([1000, 1000, 1000, 1000], [10, -10, 0, 10], [0, 1, 0, 1], [1000] * 4)
+    assert_parity(rows)
+    estimates, mask = estimate_opponent_elo_batch(*[np.array(x) for x in rows])
+    assert mask.tolist() == [True, True, False, False]
+    assert estimates[mask].tolist() == [INCONSISTENT_ESTIMATE] * 2
+    with pytest.raises(ValueError):
+        estimate_opponent_elo(1000, 10, 0, 1000)
+
+
+def test_match_table_estimates_its_columns():
+    table = MatchTable(
+        {
+            "elo_rank_new": np.array([1000, 1100]),
+            "elo_change": np.array([12, -8]),
+            "match_win": np.array([1, 0]),
+            "opponent_elo": np.array([-1, -2]),
+        }
+    )
+    estimates, mask = table.estimate_opponent_elo()
+    assert estimates.tolist() == scalar([1000, 1100], [12, -8], [1, 0], [-1, -2])[0]
+    assert not mask.any()
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from devserver.backend import StandInBackend
+from utils import backend
+from utils.current_state import TIERS, TIERS_PATH, cached_tiers, reconcile, tier_for, tiers_from
+from utils.reference_cache import ReferenceCache
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = StandInBackend().start()
+    monkeypatch.setattr(backend, "BASE_URL", server.url)
+    yield server
+    server.stop()
+
+
+def test_tier_for_uses_the_highest_floor_below():
+    assert tier_for(-2) == ("N/A", "N/A")
+    assert tier_for(0) == ("Stone", "ST")
+    assert tier_for(899) == ("Silver", "SI")
+    assert tier_for(900) == ("Gold", "GO")
+    assert tier_for(5000) == ("Grandmaster", "GM")
+
+
+def test_tiers_from_backend_rows():
+    table = {
+        "data": [
+            {"tier_display_name": "High", "tier_short_name": "HI", "min_threshold": 1000, "max_threshold": None},
+            {"tier_display_name": "Low", "tier_short_name": "LO", "min_threshold": 0, "max_threshold": 999},
+            {"tier_display_name": "Unused", "tier_short_name": "UN", "min_threshold": None, "max_threshold": None},
+        ]
+    }
+    tiers = tiers_from(table)
+    assert tiers == ((0, "Low", "LO"), (1000, "High", "HI"))
+    assert tier_for(1500, tiers) == ("High", "HI")
+    assert tiers_from(None) == ()
+
+
+def test_cached_tiers_never_wait_on_the_backend(tmp_path, stand_in):
+    stand_in.tables[TIERS_PATH]["data"][0]["tier_display_name"] = "Pebble"
+    cache = ReferenceCache(os.path.join(tmp_path, "reference.json"), ttl=0)
+    assert cached_tiers(cache) == TIERS
+    cache.refresh(TIERS_PATH)
+    # A stale copy is still used as it is, the background refresh revalidates it
+    assert cached_tiers(cache)[0] == (0, "Pebble", "ST")
+    assert stand_in.requests[f"GET {TIERS_PATH}"] == 1
+
+
+def test_reconcile_prefers_the_later_game():
+    local = {"status": "LOCAL", "data": {"last_game_number": 10, "current_elo": 1000}}
+    remote = {"status": "SUCCESS", "data": {"last_game_number": 11, "current_elo": 1010}}
+    assert reconcile(local, remote) is remote
+    assert reconcile(remote, local) is remote
@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, timedelta
+
+from utils import calc_elo
+from utils.elo_replay import PHASE_K, START, EloReplay, phase_for, step
+from utils.match import Match
+from utils.scanner import RankUpdate
+
+
+def make_records(count: int, seed: int = 7) -> list[RankUpdate]:
+    rng = random.Random(seed)
+    ts = datetime(2025, 1, 1, 20, 0, 0)
+    elo = 1000
+    wins = 0
+    streak = 0
+    records = []
+    for i in range(count):
+        ts += timedelta(minutes=rng.randint(4, 15))
+        change = rng.choice((-1, 1)) * rng.randint(5, 30)
+        wins += change > 0
+        streak = streak + 1 if change > 0 else 0
+        records.append(RankUpdate("Rivals2.log", i * 120, i, ts, elo + change, elo, change, i + 1, wins, streak))
+        elo += change
+    return records
+
+
+def flip(record: RankUpdate) -> RankUpdate:
+    """The same game with the opposite result"""
+    change = -record.elo_change - 1
+    return record._replace(elo_change=change, elo_rank_new=record.elo_rank_old + change)
+
+
+def assert_same_as_full_replay(replay: EloReplay):
+    full = EloReplay(replay.games, replay.every)
+    assert replay.estimates == full.estimates
+    assert replay.inconsistent == full.inconsistent
+    assert replay.checkpoints == full.checkpoints
+    assert replay.state == full.state
+
+
+def test_batched_corrections_match_full_replay():
+    records = make_records(1000)
+    replay = EloReplay(records, every=100)
+    replay.add([flip(records[10]), flip(records[800])])
+    assert_same_as_full_replay(replay)
+    assert replay.estimate(801) == EloReplay(replay.games, 100).estimate(801)
+
+
+def test_random_batches_match_full_replay():
+    rng = random.Random(3)
+    records = make_records(600)
+    replay = EloReplay(records[:500], every=50)
+    for _ in range(20):
+        batch = [flip(replay.games[i]) for i in rng.sample(range(len(replay)), rng.randint(1, 4))]
+        replay.add(batch)
+        assert_same_as_full_replay(replay)
+    replay.add(records[500:])
+    assert_same_as_full_replay(replay)
+
+
+def test_backfill_matches_full_replay():
+    records = make_records(300)
+    missing = records.pop(120)
+    replay = EloReplay(records, every=25)
+    replay.add([missing])
+    assert [x.ranked_game_number for x in replay.games] == list(range(1, 301))
+    assert_same_as_full_replay(replay)
+
+
+def test_match_win_disagreeing_with_change_is_inconsistent():
+    match = Match(match_date=datetime(2025, 1, 1), elo_rank_new=1010, elo_change=10, match_win=0, ranked_game_number=30)
+    state, estimate, inconsistent = step(START, match)
+    assert inconsistent
+    assert estimate == calc_elo.INCONSISTENT_ESTIMATE
+    assert state.streak == 0
+
+
+def test_estimate_uses_phase_k_like_the_scalar_estimate():
+    records = make_records(40)
+    replay = EloReplay(records)
+    for game, estimate in zip(records, replay.estimates):
+        k = PHASE_K[phase_for(game.ranked_game_number)]
+        expected = calc_elo.estimate_opponent_elo(game.elo_rank_new, game.elo_change, int(game.elo_change >= 0), -1, k=k)
+        assert estimate == expected
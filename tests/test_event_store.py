@@ -0,0 +1,63 @@
+import os
+from datetime import datetime
+
+from utils.event_store import EventStore
+from utils.scanner import CharacterPick, MatchDuration, RankUpdate
+
+TS = datetime(2025, 1, 1, 20, 0, 0)
+
+
+def count_events(store: EventStore) -> int:
+    return store.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+def test_same_second_events_are_all_kept(tmp_path):
+    store = EventStore(os.path.join(tmp_path, "events.db"))
+    events = [
+        CharacterPick("Rivals2.log", 100, 1, TS, "Kragg"),
+        CharacterPick("Rivals2.log", 200, 2, TS, "Kragg"),
+        MatchDuration("Rivals2.log", 300, 3, TS, 120),
+    ]
+    store.add_events(events)
+    assert count_events(store) == 3
+    assert [x[0] for x in store.events_between(TS, TS)] == ["CharacterPick", "CharacterPick", "MatchDuration"]
+    store.close()
+
+
+def test_rereading_a_log_adds_nothing(tmp_path):
+    store = EventStore(os.path.join(tmp_path, "events.db"))
+    events = [
+        CharacterPick("Rivals2.log", 100, 1, None, "Kragg"),
+        RankUpdate("Rivals2.log", 150, 2, TS, 1010, 1000, 10, 7, 4, 1),
+    ]
+    assert store.add_events(events) == 1
+    assert store.add_events(events) == 0
+    assert count_events(store) == 1
+    store.close()
+
+
+def test_recreated_log_keeps_new_events_at_read_offsets(tmp_path):
+    store = EventStore(os.path.join(tmp_path, "events.db"))
+    store.add_events([CharacterPick("Rivals2.log", 100, 1, TS, "Kragg")])
+    # The game started a new Rivals2.log, so the same offsets hold new lines
+    store.add_events([CharacterPick("Rivals2.log", 100, 1, TS.replace(hour=21), "Kragg")])
+    assert count_events(store) == 2
+    store.close()
+
+
+def test_backup_copies_add_nothing(tmp_path):
+    store = EventStore(os.path.join(tmp_path, "events.db"))
+    # Read from a checkpoint, so offsets and line numbers differ from the backup's
+    store.add_events(
+        [
+            CharacterPick("Rivals2.log", 100, 0, TS, "Kragg"),
+            CharacterPick("Rivals2.log", 200, 1, TS, "Kragg"),
+        ]
+    )
+    backup = [
+        CharacterPick("Rivals2-backup-2025.01.01.log", 5100, 40, TS, "Kragg"),
+        CharacterPick("Rivals2-backup-2025.01.01.log", 5200, 41, TS, "Kragg"),
+    ]
+    store.add_events(backup)
+    assert count_events(store) == 2
+    store.close()
@@ -0,0 +1,163 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from log_parser import build_match
+from utils.outbox import Outbox, drain, retry_delay
+from utils.scanner import RankUpdate
+
+EXTRA_DATA = {
+    "opponent_elo": 900,
+    "opponent_name": "bob",
+    "final_move_id": 4,
+    **{
+        f"game_{n}_{field}": n
+        for n in (1, 2, 3)
+        for field in ("char_pick", "opponent_pick", "stage", "winner", "final_move_id", "duration")
+    },
+}
+
+
+def update(number: int, change: int = 10) -> RankUpdate:
+    return RankUpdate("Rivals2.log", number * 100, number, datetime(2025, 1, 1), 1000 + change, 1000, change, number, 1, 1)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = Outbox(os.path.join(tmp_path, "outbox.db"))
+    yield outbox
+    outbox.close()
+
+
+class Backend:
+    """Existence checks and posts against a set of stored ranked game numbers"""
+
+    def __init__(self, existing=(), failing=(), unreachable=()):
+        self.existing = set(existing)
+        self.failing = set(failing)
+        # Checks of batches holding these raise
+        self.unreachable = set(unreachable)
+        self.checked = []
+        self.posted = []
+
+    def check(self, ranked_game_numbers):
+        self.checked.extend(ranked_game_numbers)
+        if self.unreachable & set(ranked_game_numbers):
+            raise ConnectionError("backend down")
+        return self.existing & set(ranked_game_numbers)
+
+    def post(self, matches):
+        results = {}
+        for x in matches:
+            if x.ranked_game_number in self.failing:
+                results[x.ranked_game_number] = {"error": "down"}
+            else:
+                self.posted.append(x)
+                self.existing.add(x.ranked_game_number)
+                results[x.ranked_game_number] = {"status": "ok"}
+        return results
+
+
+def test_drain_posts_new_and_drops_existing(outbox):
+    backend = Backend(existing={2})
+    outbox.add([update(1), update(2), update(3)])
+    sent, left = drain(outbox, backend.check, build_match, backend.post, batch_size=2)
+    assert sent == [1, 2, 3]
+    assert left == 0
+    assert sorted(x.ranked_game_number for x in backend.posted) == [1, 3]
+
+
+def test_failed_posts_wait_for_their_retry(outbox):
+    backend = Backend(failing={2})
+    outbox.add([update(1), update(2)])
+    assert drain(outbox, backend.check, build_match, backend.post) == ([1], 1)
+    # Not due again until the backoff passes
+    assert drain(outbox, backend.check, build_match, backend.post) == ([], 1)
+    assert outbox.next_attempt() > 0
+    backend.failing.clear()
+    assert [x.ranked_game_number for x, _ in outbox.due(now=outbox.next_attempt())] == [2]
+
+
+def test_failed_checks_stay_queued(outbox):
+    backend = Backend(unreachable={3})
+    outbox.add([update(x) for x in range(1, 7)])
+    sent, left = drain(outbox, backend.check, build_match, backend.post, batch_size=2)
+    assert sent == [1, 2, 5, 6]
+    assert left == 2
+    assert sorted(x.ranked_game_number for x in backend.posted) == [1, 2, 5, 6]
+    backend.unreachable.clear()
+    assert [x.ranked_game_number for x, _ in outbox.due(now=outbox.next_attempt())] == [3, 4]
+
+
+def test_matches_without_a_post_result_stay_queued(outbox):
+    backend = Backend()
+    outbox.add([update(1), update(2)])
+    sent, left = drain(outbox, backend.check, build_match, lambda batch: {1: {"status": "ok"}})
+    assert sent == [1]
+    assert left == 1
+
+
+def test_retry_delay_doubles_up_to_the_cap():
+    assert [retry_delay(n) for n in (1, 2, 3)] == [5, 10, 20]
+    assert retry_delay(50) == 600
+
+
+def test_extra_data_applies_to_the_only_new_match(outbox):
+    backend = Backend(existing={1, 2}, failing={3})
+    outbox.add([update(1), update(2), update(3)], EXTRA_DATA)
+    drain(outbox, backend.check, build_match, backend.post)
+    assert [x.ranked_game_number for x, _ in outbox.due(now=outbox.next_attempt())] == [3]
+    # The failed game keeps the extra_data, the others' copies are cleared
+    backend.failing.clear()
+    with outbox.conn:
+        outbox.conn.execute("UPDATE outbox SET next_attempt = 0")
+    drain(outbox, backend.check, build_match, backend.post)
+    [posted] = backend.posted
+    assert posted.ranked_game_number == 3
+    assert posted.opponent_name == "bob"
+    assert posted.game_2_stage == 2
+
+
+def test_extra_data_group_is_checked_once(outbox):
+    backend = Backend(existing={1})
+    outbox.add([update(1), update(2)], EXTRA_DATA)
+    drain(outbox, backend.check, build_match, backend.post)
+    assert sorted(backend.checked) == [1, 2]
+
+
+def test_extra_data_waits_when_its_check_fails(outbox):
+    backend = Backend(unreachable={2})
+    outbox.add([update(1), update(2)], EXTRA_DATA)
+    outbox.add([update(3)])
+    assert drain(outbox, backend.check, build_match, backend.post) == ([3], 2)
+    assert [extra for _, extra in outbox.due(now=outbox.next_attempt())] == [EXTRA_DATA, EXTRA_DATA]
+
+
+def test_extra_data_is_dropped_when_several_matches_are_new(outbox):
+    backend = Backend(existing={1})
+    outbox.add([update(1), update(2), update(3)], EXTRA_DATA)
+    sent, _ = drain(outbox, backend.check, build_match, backend.post)
+    assert sent == [1, 2, 3]
+    assert [x.opponent_elo for x in backend.posted] == [build_match(update(2)).opponent_elo] * 2
+
+
+def test_queueing_again_replaces_the_row(outbox):
+    outbox.add([update(1, change=10)])
+    outbox.add([update(1, change=-10)])
+    assert len(outbox) == 1
+    [(queued, _)] = outbox.due()
+    assert queued.elo_change == -10
+
+
+def test_matches_are_built_only_for_new_games(outbox):
+    backend = Backend(existing={1, 3})
+    built = []
+
+    def build(x, extra):
+        built.append(x.ranked_game_number)
+        return build_match(x, extra)
+
+    outbox.add([update(x) for x in (1, 2, 3, 4)])
+    assert drain(outbox, backend.check, build, backend.post, batch_size=2) == ([1, 2, 3, 4], 0)
+    assert sorted(built) == [2, 4]
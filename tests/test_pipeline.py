@@ -0,0 +1,67 @@
+from typing import NamedTuple
+
+import pytest
+
+from utils.pipeline import check_and_post
+
+
+class Record(NamedTuple):
+    ranked_game_number: int
+
+
+class Built(NamedTuple):
+    ranked_game_number: int
+
+
+def records(count: int) -> list[Record]:
+    return [Record(x) for x in range(1, count + 1)]
+
+
+def test_checks_and_posts_only_new_matches():
+    posted = []
+
+    def post(batch):
+        posted.extend(batch)
+        return {x.ranked_game_number: {"status": "ok"} for x in batch}
+
+    results = check_and_post(records(10), lambda ids: {x for x in ids if x % 3 == 0}, lambda x: Built(*x), post, 3, 2)
+    assert [x.ranked_game_number for x, _ in results] == [1, 2, 4, 5, 7, 8, 10]
+    assert all(isinstance(x, Built) and res == {"status": "ok"} for x, res in results)
+    assert sorted(x.ranked_game_number for x in posted) == [1, 2, 4, 5, 7, 8, 10]
+
+
+@pytest.mark.parametrize("concurrency", [1, 2, 4])
+def test_a_failed_check_fails_only_its_batch(concurrency):
+    def check(ids):
+        if 3 in ids:
+            raise ConnectionError("backend down")
+        return set()
+
+    posted = []
+
+    def post(batch):
+        posted.extend(x.ranked_game_number for x in batch)
+        return {x.ranked_game_number: {"status": "ok"} for x in batch}
+
+    results = check_and_post(records(6), check, lambda x: Built(*x), post, concurrency, 2)
+    assert [x.ranked_game_number for x, _ in results] == [1, 2, 3, 4, 5, 6]
+    failed = {x.ranked_game_number: res for x, res in results if "error" in res}
+    assert sorted(failed) == [3, 4]
+    assert all("backend down" in x["error"] for x in failed.values())
+    assert sorted(posted) == [1, 2, 5, 6]
+
+
+def test_a_failed_post_fails_only_its_batch():
+    def post(batch):
+        if any(x.ranked_game_number == 1 for x in batch):
+            raise ConnectionError("reset")
+        return {x.ranked_game_number: {"status": "ok"} for x in batch}
+
+    results = dict(check_and_post(records(4), lambda ids: set(), lambda x: Built(*x), post, 2, 2))
+    assert "reset" in results[Built(1)]["error"] and "reset" in results[Built(2)]["error"]
+    assert results[Built(3)] == results[Built(4)] == {"status": "ok"}
+
+
+def test_without_post_only_checks():
+    results = check_and_post(records(3), lambda ids: {2}, lambda x: Built(*x))
+    assert results == [(Built(1), None), (Built(3), None)]
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from devserver.push_server import PushServer
+from push_client import PushClient
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # Signals from the client's thread are delivered by the event loop
+        QCoreApplication.processEvents()
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def server():
+    server = PushServer().start()
+    yield server
+    server.stop()
+
+
+def test_events_both_ways(app, server):
+    client = PushClient(f"ws://127.0.0.1:{server.port}/")
+    tiers = []
+    names = []
+    client.tier_changed.connect(tiers.append)
+    client.opponent_names_changed.connect(lambda added, removed: names.append((added, removed)))
+    client.start()
+    try:
+        assert wait_for(lambda: client.connected and server.clients)
+        server.broadcast("tier_changed", {"current_elo": 1234})
+        server.broadcast("opponent_names", {"added": ["a"], "removed": ["b"]})
+        server.broadcast("no_such_type", {})
+        client.send("matches_parsed", {"ranked_game_numbers": [1, 2]})
+        assert wait_for(lambda: tiers and names and server.received)
+        assert tiers == [{"current_elo": 1234}]
+        assert names == [(["a"], ["b"])]
+        assert server.received == [{"type": "matches_parsed", "data": {"ranked_game_numbers": [1, 2]}}]
+    finally:
+        client.stop()
+        assert client.wait(2000)
+    assert not client.connected
+
+
+def test_stop_cuts_the_reconnect_backoff_short(app, server):
+    port = server.port
+    server.stop()
+    client = PushClient(f"ws://127.0.0.1:{port}/")
+    client.start()
+    time.sleep(0.3)
+    start = time.monotonic()
+    client.stop()
+    assert client.wait(2000)
+    assert time.monotonic() - start < 1.0
+
+
+def test_bad_messages_are_ignored(app):
+    client = PushClient("ws://127.0.0.1:1/")
+    seen = []
+    client.reference_changed.connect(seen.append)
+    client.handle_message("not json")
+    client.handle_message('{"data": {}}')
+    client.handle_message('{"type": "reference_changed", "data": {"path": "/stages"}}')
+    assert seen == ["/stages"]
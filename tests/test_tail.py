@@ -0,0 +1,59 @@
+import os
+import threading
+
+from utils.tail import LogCheckpoint, TailReader, load_checkpoint, save_checkpoint
+
+
+def write(path: str, text: str, mode: str = "a"):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def test_resumes_after_the_checkpoint(tmp_path):
+    log = os.path.join(tmp_path, "Rivals2.log")
+    write(log, "one\ntwo\nparti", "w")
+    reader = TailReader(log)
+    assert [x for _, x in reader] == ["one\n", "two\n"]
+    checkpoint = reader.checkpoint()
+    write(log, "al\nthree\n")
+    assert [x for _, x in TailReader(log, checkpoint)] == ["partial\n", "three\n"]
+
+
+def test_truncated_log_reads_from_the_start(tmp_path):
+    log = os.path.join(tmp_path, "Rivals2.log")
+    write(log, "one\ntwo\nthree\n", "w")
+    reader = TailReader(log)
+    list(reader)
+    checkpoint = reader.checkpoint()
+    write(log, "new\n", "w")
+    reader = TailReader(log, checkpoint)
+    assert [x for _, x in reader] == ["new\n"]
+    assert reader.reset
+
+
+def test_each_consumer_keeps_its_own_checkpoints(tmp_path):
+    log = os.path.join(tmp_path, "Rivals2.log")
+    write(log, "one\n", "w")
+    parser_file = os.path.join(tmp_path, "log_checkpoints.json")
+    other_file = os.path.join(tmp_path, "log_checkpoints_other.json")
+    reader = TailReader(log)
+    list(reader)
+    save_checkpoint(reader.checkpoint(), parser_file)
+    assert load_checkpoint(log, parser_file).offset == 4
+    assert load_checkpoint(log, other_file) is None
+
+
+def test_concurrent_saves_keep_every_log(tmp_path):
+    checkpoint_file = os.path.join(tmp_path, "log_checkpoints.json")
+    paths = [os.path.join(tmp_path, f"Rivals2-{i}.log") for i in range(16)]
+
+    def save(path):
+        save_checkpoint(LogCheckpoint(path=path, offset=len(path)), checkpoint_file)
+
+    threads = [threading.Thread(target=save, args=(x,)) for x in paths]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [load_checkpoint(x, checkpoint_file).offset for x in paths] == [len(x) for x in paths]
+    assert os.listdir(tmp_path) == ["log_checkpoints.json"]
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.timestamps import parse_log_timestamp
+
+
+def test_fixed_width_prefix():
+    line = "[2025.03.04-21.05.06:789][123]LogTemp: something"
+    assert parse_log_timestamp(line) == datetime(2025, 3, 4, 21, 5, 6)
+    assert parse_log_timestamp(line, millis=True) == datetime(2025, 3, 4, 21, 5, 6, 789000)
+
+
+def test_regex_fallback_and_no_timestamp():
+    assert parse_log_timestamp("  [2025.03.04-21.05.06] late prefix") == datetime(2025, 3, 4, 21, 5, 6)
+    assert parse_log_timestamp("no timestamp here") is None
+    assert parse_log_timestamp("[2025.13.04-21.05.06:000]") is None
+
+
+def test_days_from_several_threads():
+    lines = [f"[2025.01.{day:02d}-10.00.00:000] x" for day in range(1, 29)] * 200
+
+    def parse(line):
+        return line, parse_log_timestamp(line)
+
+    with ThreadPoolExecutor(8) as pool:
+        for line, ts in pool.map(parse, lines):
+            assert ts.day == int(line[9:11])
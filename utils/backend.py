@@ -0,0 +1,189 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+import requests
+import requests.exceptions
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from utils import serialize
+from utils.log import setup_logging
+from utils.match import Match
+
+config = Config()
+
+logger = setup_logging()
+
+BASE_URL = f"http://{config.be_host}:{config.be_port}"
+# Concurrent single lookups when the backend has no bulk route
+FALLBACK_WORKERS = config.max_concurrency
+# Kept-alive connections shared by every thread's session, one per request
+# the check/post pipeline keeps in flight
+POOL_SIZE = config.max_concurrency
+# (connect, read) in seconds, a dead host fails fast but slow queries still finish
+TIMEOUT = (3.05, 10)
+# GETs are retried on connection errors and gateway errors, POSTs never are
+RETRIES = 3
+BACKOFF = 0.3
+# Seconds after a GET's first failure that retries may still start, so a dead
+# host costs about two connect timeouts instead of one per retry
+RETRY_TIME = 3.0
+# Matches per POST /insert-matches, keeps a big backfill's bodies reasonable
+BULK_INSERT_SIZE = 200
+
+_bulk_exists_supported = True
+_bulk_insert_supported = True
+
+
+class _Retry(Retry):
+    """Retry that stops once RETRY_TIME has passed since the first failure"""
+
+    def __init__(self, *args, first_failure: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.first_failure = first_failure
+
+    def new(self, **kwargs) -> "_Retry":
+        # Only increment() makes new ones, and it does so on a failure
+        kwargs.setdefault("first_failure", self.first_failure or time.monotonic())
+        return super().new(**kwargs)
+
+    def is_exhausted(self) -> bool:
+        if self.first_failure is not None and time.monotonic() - self.first_failure + self.get_backoff_time() > RETRY_TIME:
+            return True
+        return super().is_exhausted()
+
+
+def _make_adapter() -> HTTPAdapter:
+    retry = _Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+
+# One connection pool mounted on every session, so connections opened by one
+# drain's threads are reused by the next instead of closing with them
+_adapter = _make_adapter()
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", _adapter)
+    session.mount("https://", _adapter)
+    return session
+
+
+# A session per thread: requests.Session isn't safe to share between
+# threads, the connection pool underneath is
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    """The calling thread's session, made on first use"""
+    if not hasattr(_local, "session"):
+        _local.session = _make_session()
+    return _local.session
+
+
+def get(path: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", TIMEOUT)
+    return session().get(f"{BASE_URL}{path}", **kwargs)
+
+
+def post(path: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", TIMEOUT)
+    return session().post(f"{BASE_URL}{path}", **kwargs)
+
+
+def _exists_payload(match_ids: list[int]) -> dict:
+    # A contiguous run of game numbers is sent as a range
+    if match_ids == list(range(match_ids[0], match_ids[-1] + 1)):
+        return {"start": match_ids[0], "end": match_ids[-1]}
+    return {"match_numbers": match_ids}
+
+
+def match_exists(match_id: int) -> bool:
+    res = get(f"/match-exists?match_number={match_id}")
+    return res.status_code == 200
+
+
+def _exists_one_by_one(match_ids: list[int]) -> set[int]:
+    with ThreadPoolExecutor(max_workers=FALLBACK_WORKERS) as pool:
+        found = pool.map(match_exists, match_ids)
+        return {match_id for match_id, exists in zip(match_ids, found) if exists}
+
+
+def existing_matches(match_ids: Iterable[int]) -> set[int]:
+    """Which of the ranked game numbers the backend already has.
+
+    Asks POST /match-exists/bulk in one round trip. Falls back to concurrent
+    GET /match-exists calls for the rest of the session if the backend
+    doesn't have that route, and for this call if the reply is malformed.
+    Connection errors, timeouts and error statuses are raised, so callers
+    retry later instead of sending a request per id to a backend that is
+    down.
+    """
+    global _bulk_exists_supported
+    match_ids = sorted(set(match_ids))
+    if not match_ids:
+        return set()
+    if _bulk_exists_supported:
+        res = post("/match-exists/bulk", json=_exists_payload(match_ids))
+        if res.status_code in (404, 405):
+            logger.info("Backend has no bulk match-exists route, checking one by one")
+            _bulk_exists_supported = False
+        else:
+            res.raise_for_status()
+            try:
+                return {int(x) for x in res.json()["data"]["existing"]} & set(match_ids)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Malformed bulk match-exists reply, checking one by one: {e}")
+    return _exists_one_by_one(match_ids)
+
+
+def insert_batch_size() -> int:
+    """Matches per insert request, 1 once the backend turned out to lack bulk inserts"""
+    return BULK_INSERT_SIZE if _bulk_insert_supported else 1
+
+
+def insert_matches(matches: list[Match], debug: bool = False) -> Optional[dict[int, dict]]:
+    """Insert matches with POST /insert-matches, a JSON array per request.
+
+    The backend answers {"data": {"results": [...]}} with one row per match,
+    each carrying its ranked_game_number and an "error" key if it wasn't
+    inserted. Returns those rows by ranked game number, with an {"error": ...}
+    for matches whose batch failed or that got no row back. Returns None when
+    the backend has no bulk route so the caller can post one by one.
+    """
+    global _bulk_insert_supported
+    if not _bulk_insert_supported:
+        return None
+    results = {}
+    for start in range(0, len(matches), BULK_INSERT_SIZE):
+        chunk = matches[start : start + BULK_INSERT_SIZE]
+        try:
+            res = post(
+                f"/insert-matches{'?debug=1' if debug else ''}",
+                data=serialize.dump_matches(chunk),
+            )
+            if start == 0 and res.status_code in (404, 405):
+                logger.info("Backend has no bulk insert-matches route, posting one by one")
+                _bulk_insert_supported = False
+                return None
+            res.raise_for_status()
+            by_id = {int(row["ranked_game_number"]): row for row in res.json()["data"]["results"]}
+            error = "No result from backend for match"
+        except (requests.exceptions.RequestException, KeyError, TypeError, ValueError) as e:
+            # A malformed reply fails the whole chunk, the outbox retries it
+            logger.error(f"Bulk insert of {len(chunk)} matches failed: {e}")
+            by_id = {}
+            error = f"Failed to post match to backend: {e}"
+        for match in chunk:
+            results[match.ranked_game_number] = by_id.get(match.ranked_game_number, {"error": error})
+    return results
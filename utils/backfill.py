@@ -0,0 +1,122 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from config import Config
+from utils.folders import write_json
+from utils.log import setup_logging, worker_log_queue, worker_logging
+from utils.scanner import (
+    CharacterPick,
+    FinalMove,
+    LogEvent,
+    MatchDuration,
+    RankUpdate,
+    StageSelect,
+    Winner,
+    scan_files,
+)
+
+config = Config()
+
+logger = setup_logging()
+
+CACHE_FILE = os.path.join(config.app_log_dir, "parsed_logs.json")
+LIVE_LOG = "Rivals2.log"
+
+EVENT_TYPES = {
+    x.__name__: x
+    for x in (RankUpdate, MatchDuration, CharacterPick, StageSelect, Winner, FinalMove)
+}
+
+
+def find_backup_logs(folder: str) -> list[str]:
+    """Rotated logs from earlier game sessions, oldest first"""
+    names = [
+        x
+        for x in os.listdir(folder)
+        if x.startswith("Rivals2") and x.endswith(".log") and x != LIVE_LOG
+    ]
+    # Rivals2-backup-YYYY.MM.DD-HH.MM.SS.log sorts by date
+    return [os.path.join(folder, x) for x in sorted(names)]
+
+
+def _file_key(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _dump_event(event: LogEvent) -> list:
+    fields = list(event)
+    if fields[3] is not None:
+        fields[3] = fields[3].isoformat()
+    return [type(event).__name__, *fields]
+
+
+def _load_event(row: list) -> LogEvent:
+    fields = row[1:]
+    if fields[3] is not None:
+        fields[3] = datetime.fromisoformat(fields[3])
+    return EVENT_TYPES[row[0]](*fields)
+
+
+def scan_log_file(path: str) -> list[LogEvent]:
+    """Every event in one log, run in the worker processes"""
+    return list(scan_files([path]))
+
+
+def load_cache(cache_file: str = CACHE_FILE) -> dict:
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Couldn't read parsed log cache {cache_file}: {e}")
+        return {}
+
+
+def save_cache(cache: dict, cache_file: str = CACHE_FILE):
+    # Drop logs that have since been deleted
+    cache = {k: v for k, v in cache.items() if os.path.exists(k)}
+    write_json(cache_file, cache)
+
+
+def scan_logs(files: list[str], workers: int = None, cache_file: str = CACHE_FILE) -> list[LogEvent]:
+    """Events from every file, in file order.
+
+    Files are cached by (path, size, mtime) so a closed backup is only parsed
+    once; anything new or changed is parsed concurrently in a process pool.
+    """
+    cache = load_cache(cache_file)
+    keys = {}
+    todo = []
+    for file in files:
+        path = os.path.abspath(file)
+        keys[path] = _file_key(path)
+        entry = cache.get(path)
+        if not entry or entry["key"] != keys[path]:
+            todo.append(path)
+    logger.debug(f"{len(files) - len(todo)} logs cached, parsing {len(todo)}")
+
+    if len(todo) > 1:
+        # Workers log through this process, which alone writes app.log
+        with worker_log_queue() as queue:
+            with ProcessPoolExecutor(max_workers=workers, initializer=worker_logging, initargs=(queue,)) as pool:
+                parsed = dict(zip(todo, pool.map(scan_log_file, todo)))
+    else:
+        parsed = {x: scan_log_file(x) for x in todo}
+
+    for path, events in parsed.items():
+        cache[path] = {"key": keys[path], "events": [_dump_event(x) for x in events]}
+    if parsed:
+        save_cache(cache, cache_file)
+
+    events = []
+    for file in files:
+        path = os.path.abspath(file)
+        if path in parsed:
+            events.extend(parsed[path])
+        else:
+            events.extend(_load_event(x) for x in cache[path]["events"])
+    return events
@@ -1,9 +1,39 @@
 import sys
 from utils.log import setup_logging
+import logging
 import math
 
+import numpy as np
+
 log = setup_logging()
 
+k_values = {
+    "ranked_elo_placement_k": 120.0,
+    "ranked_elo_postplacement_k": 40.0,
+    "ranked_elo_established_k": 24.0,
+    "ranked_placement_median_k": 80.0,
+    "ranked_placement_edge_k": 40.0,
+    "ranked_placement_median_elo": 900,
+    "ranked_placement_edge_difference": 450
+}
+winstreak_brkpt = {
+      0: 0.00,
+      1: 0.35,
+      2: 0.35,
+      3: 0.35,
+      4: 0.45,
+      5: 0.45,
+      6: 0.5,
+      7: 0.5,
+      8: 0.5,
+      9: 0.75,
+      10: 1.0
+}
+# Keeps the expected score off 0 and 1, where the odds ratio blows up
+EPSILON = 1e-6
+# Estimate given to rows whose result and ELO change disagree
+INCONSISTENT_ESTIMATE = -999
+
 def estimate_opponent_elo(my_elo: int, elo_change: int, result: int, opponent_elo:int, winstreak: int = 0, k: float = 24.0) -> int:
     """Try and guess elo
 
@@ -20,28 +50,6 @@ def estimate_opponent_elo(my_elo: int, elo_change: int, result: int, opponent_el
     Returns:
         int: Opponent's guessed elo
     """
-    k_values = {
-        "ranked_elo_placement_k": 120.0,
-        "ranked_elo_postplacement_k": 40.0,
-        "ranked_elo_established_k": 24.0,
-        "ranked_placement_median_k": 80.0,
-        "ranked_placement_edge_k": 40.0,
-        "ranked_placement_median_elo": 900,
-        "ranked_placement_edge_difference": 450
-    }
-    winstreak_brkpt = {
-          0: 0.00,
-          1: 0.35,
-          2: 0.35,
-          3: 0.35,
-          4: 0.45,
-          5: 0.45,
-          6: 0.5,
-          7: 0.5,
-          8: 0.5,
-          9: 0.75,
-          10: 1.0
-    }
     if winstreak > 10:
         winstreak = 10
     winstreak_bonus = winstreak_brkpt[winstreak]
@@ -50,14 +58,39 @@ def estimate_opponent_elo(my_elo: int, elo_change: int, result: int, opponent_el
     if (result == 1 and elo_change < 0) or (result == 0 and elo_change > 0):
         raise ValueError("Mismatch between match result and elo change sign.")
     expected_score = result - (elo_change / k)
-    epsilon = 1e-6
-    expected_score = max(epsilon, min(1 - epsilon, expected_score))
+    expected_score = max(EPSILON, min(1 - EPSILON, expected_score))
     odds_ratio = (1 - expected_score) / expected_score
     est_opponent_elo = my_elo + 400 * math.log10(odds_ratio)
     k *= 1 + winstreak_bonus
-    log.debug(f"Elo:{my_elo}, Change:{elo_change}, Result:{result}, OppElo:{int(opponent_elo)}, OppEloEst{int(est_opponent_elo)}, K:{k}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(f"Elo:{my_elo}, Change:{elo_change}, Result:{result}, OppElo:{int(opponent_elo)}, OppEloEst{int(est_opponent_elo)}, K:{k}")
     return math.floor(est_opponent_elo)
 
+def estimate_opponent_elo_batch(my_elo, elo_change, result, opponent_elo, k=24.0) -> tuple[np.ndarray, np.ndarray]:
+    """estimate_opponent_elo over whole columns at once
+
+    Args:
+        my_elo, elo_change, result, opponent_elo: Array-likes of the same length
+        k (float or array, optional): Algo change. Defaults 24, rows with an
+            opponent_elo of -2 use the post-placement K like the scalar version
+
+    Returns:
+        tuple: (estimates, inconsistent) where estimates is an int64 array and
+            inconsistent masks the rows whose result and elo change sign
+            disagree. Those rows get INCONSISTENT_ESTIMATE instead of raising.
+    """
+    my_elo = np.asarray(my_elo, dtype=np.float64)
+    elo_change = np.asarray(elo_change, dtype=np.float64)
+    result = np.asarray(result)
+    opponent_elo = np.asarray(opponent_elo)
+    k = np.where(opponent_elo == -2, k_values["ranked_elo_postplacement_k"], k)
+    inconsistent = ((result == 1) & (elo_change < 0)) | ((result == 0) & (elo_change > 0))
+    expected_score = np.clip(result - elo_change / k, EPSILON, 1 - EPSILON)
+    est_opponent_elo = my_elo + 400 * np.log10((1 - expected_score) / expected_score)
+    estimates = np.floor(est_opponent_elo).astype(np.int64)
+    estimates[inconsistent] = INCONSISTENT_ESTIMATE
+    return estimates, inconsistent
+
 def main():
     estimate_opponent_elo(my_elo=1009, elo_change=11, result=1, opponent_elo=-2, winstreak=3)
     return 0
@@ -0,0 +1,142 @@
+import bisect
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from config import Config
+from utils.event_store import STORE_FILE, EventStore
+from utils.log import setup_logging
+from utils.reference_cache import ReferenceCache
+from utils.scanner import RankUpdate, scan_files
+from utils.tail import checkpoint_file, load_checkpoint, save_checkpoint
+
+config = Config()
+
+logger = setup_logging()
+
+TIERS_PATH = "/tiers"
+# Rivals 2 ranked tiers as (lowest ELO, name, short name), used until the
+# backend's tiers table has been fetched once
+TIERS = (
+    (0, "Stone", "ST"),
+    (500, "Bronze", "BR"),
+    (700, "Silver", "SI"),
+    (900, "Gold", "GO"),
+    (1100, "Platinum", "PL"),
+    (1300, "Diamond", "DI"),
+    (1500, "Master", "MA"),
+    (1700, "Grandmaster", "GM"),
+)
+
+# Marks a /current_tier shaped response as built from the local logs
+LOCAL_STATUS = "LOCAL"
+
+CHECKPOINT_FILE = checkpoint_file("current_state")
+
+
+def tiers_from(table: Optional[dict]) -> tuple:
+    """TIERS shaped rows from the backend's tiers table, empty if there are none"""
+    rows = (table or {}).get("data") or []
+    return tuple(
+        sorted(
+            (int(x["min_threshold"]), x["tier_display_name"], x["tier_short_name"])
+            for x in rows
+            if x.get("min_threshold") is not None
+        )
+    )
+
+
+def cached_tiers(cache: ReferenceCache) -> tuple:
+    """The backend's tiers from the reference cache, without waiting on the backend.
+
+    The cached copy is used however old it is, load_reference_data
+    revalidates it in the background. TIERS only if the table was never
+    fetched.
+    """
+    try:
+        return tiers_from(cache.get(TIERS_PATH)) or TIERS
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error(f"Bad tiers table from the backend: {e}")
+        return TIERS
+
+
+def tier_for(elo: int, tiers: tuple = TIERS) -> tuple[str, str]:
+    """(tier, short name) for an ELO, the tier with the highest floor at or below it"""
+    if elo < 0:
+        return "N/A", "N/A"
+    i = bisect.bisect_right([x[0] for x in tiers], elo) - 1
+    if i < 0:
+        return "N/A", "N/A"
+    return tiers[i][1:]
+
+
+@dataclass
+class CurrentState:
+    current_elo: int
+    tier: str
+    tier_short: str
+    last_game_number: int
+    total_wins: int
+    win_streak_value: int
+    # Of the last game, so the GUI can tell whether it's the one on screen
+    elo_change: int
+
+    @classmethod
+    def from_rank_update(cls, update: RankUpdate, tiers: tuple = TIERS) -> "CurrentState":
+        tier, tier_short = tier_for(update.elo_rank_new, tiers)
+        return cls(
+            current_elo=update.elo_rank_new,
+            tier=tier,
+            tier_short=tier_short,
+            last_game_number=update.ranked_game_number,
+            total_wins=update.total_wins,
+            win_streak_value=update.win_streak_value,
+            elo_change=update.elo_change,
+        )
+
+    def as_response(self) -> dict:
+        """Shaped like the backend's GET /current_tier reply"""
+        return {"status": LOCAL_STATUS, "data": asdict(self)}
+
+
+def sync_live_log(store: EventStore, path: str) -> int:
+    """Store what was appended to the log since its checkpoint, returns new rank updates"""
+    checkpoints = {path: load_checkpoint(path, CHECKPOINT_FILE)}
+    added = store.add_events(scan_files([path], checkpoints, config.use_mmap))
+    save_checkpoint(checkpoints[path], CHECKPOINT_FILE)
+    return added
+
+
+def current_state(path: str, store_file: str = STORE_FILE, tiers: tuple = TIERS) -> Optional[CurrentState]:
+    """ELO and game counts after the newest rank update in the logs.
+
+    Reads only the bytes added to the live log since the last parse, so this
+    is cheap enough to call on every refresh. tiers is usually cached_tiers().
+    None if no rank update was ever seen.
+    """
+    store = EventStore(store_file)
+    try:
+        if os.path.exists(path):
+            sync_live_log(store, path)
+        latest = store.latest_rank_update()
+    finally:
+        store.close()
+    return CurrentState.from_rank_update(latest, tiers) if latest else None
+
+
+def reconcile(local: dict, remote: dict) -> dict:
+    """Whichever /current_tier shaped response has seen the later game.
+
+    The backend only wins when it knows games the local logs don't, like
+    ones played on another machine or before the logs were rotated away.
+    """
+    local_game = int(local["data"]["last_game_number"])
+    remote_game = int(remote["data"]["last_game_number"])
+    if remote_game > local_game:
+        logger.info(f"Backend is ahead of the local logs: game {remote_game} vs {local_game}")
+        return remote
+    if remote_game == local_game and int(remote["data"]["current_elo"]) != int(local["data"]["current_elo"]):
+        logger.warning(
+            f"Backend ELO {remote['data']['current_elo']} differs from the log's {local['data']['current_elo']} for game {local_game}"
+        )
+    return local
@@ -0,0 +1,174 @@
+"""Replays a player's ranked history to get each game's K and opponent estimate.
+
+Which K a game was played at depends on where it falls in the sequence
+(placement, post-placement or established) and on the win streak it
+extends, so estimates need the whole history, not one match at a time.
+EloReplay keeps the state every CHECKPOINT_EVERY games; appending games or
+correcting an old one replays from the nearest checkpoint instead of from
+game 1.
+"""
+import bisect
+from typing import Iterable, NamedTuple, Optional
+
+from utils import calc_elo
+
+# State is saved before every this many games
+CHECKPOINT_EVERY = 100
+# Ranked game numbers up to these are placement and post-placement games
+PLACEMENT_GAMES = 5
+POSTPLACEMENT_GAMES = 25
+
+PLACEMENT = "placement"
+POSTPLACEMENT = "postplacement"
+ESTABLISHED = "established"
+PHASE_K = {
+    PLACEMENT: calc_elo.k_values["ranked_elo_placement_k"],
+    POSTPLACEMENT: calc_elo.k_values["ranked_elo_postplacement_k"],
+    ESTABLISHED: calc_elo.k_values["ranked_elo_established_k"],
+}
+
+
+class ReplayState(NamedTuple):
+    games: int
+    ranked_game_number: int
+    phase: str
+    k: float
+    streak: int
+    rating: int
+
+
+START = ReplayState(games=0, ranked_game_number=-1, phase=PLACEMENT, k=PHASE_K[PLACEMENT], streak=0, rating=-1)
+
+
+def phase_for(ranked_game_number: int) -> str:
+    if ranked_game_number <= PLACEMENT_GAMES:
+        return PLACEMENT
+    if ranked_game_number <= POSTPLACEMENT_GAMES:
+        return POSTPLACEMENT
+    return ESTABLISHED
+
+
+def step(state: ReplayState, game) -> tuple[ReplayState, int, bool]:
+    """The state after game, its opponent estimate and whether its result and change disagree.
+
+    game is a RankUpdate or Match; a Match's match_win is its result, a
+    RankUpdate's comes from the sign of its change. An opponent_elo of -2
+    (unranked) gets the post-placement K from calc_elo.estimate_opponent_elo.
+    Like there, the win streak bonus only scales the K kept in the state,
+    the estimate uses the phase's K, so it matches the posted
+    opponent_estimated_elo for the same K.
+    """
+    result = getattr(game, "match_win", -1)
+    if result not in (0, 1):
+        result = 1 if game.elo_change >= 0 else 0
+    streak = state.streak + 1 if result else 0
+    phase = phase_for(game.ranked_game_number)
+    try:
+        estimate = calc_elo.estimate_opponent_elo(
+            my_elo=game.elo_rank_new,
+            elo_change=game.elo_change,
+            result=result,
+            opponent_elo=getattr(game, "opponent_elo", -1),
+            winstreak=streak,
+            k=PHASE_K[phase],
+        )
+        inconsistent = False
+    except ValueError:
+        estimate, inconsistent = calc_elo.INCONSISTENT_ESTIMATE, True
+    k = PHASE_K[phase] * (1 + calc_elo.winstreak_brkpt[min(streak, 10)])
+    rating = game.elo_rank_new if game.elo_rank_new >= 0 else state.rating + game.elo_change
+    return ReplayState(state.games + 1, game.ranked_game_number, phase, k, streak, rating), estimate, inconsistent
+
+
+class EloReplay:
+    """A ranked history, ordered by ranked game number, and what replaying it gave.
+
+    estimates[i] and inconsistent[i] belong to games[i], state is the state
+    after the last game and checkpoints[j] the state before games[j * every].
+    replayed counts the games stepped through, to see what updates cost.
+    """
+
+    def __init__(self, games: Iterable = (), every: int = CHECKPOINT_EVERY):
+        self.every = max(1, every)
+        self.games = []
+        self.numbers = []
+        self.estimates = []
+        self.inconsistent = []
+        self.checkpoints = [START]
+        self.state = START
+        self.replayed = 0
+        self.add(games)
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def add(self, games: Iterable):
+        """Add new games, replacing any already in the history with the same number.
+
+        Games after the current last one continue from the current state.
+        Anything earlier replays from the checkpoint before the first game
+        touched. Once past the last game touched, a correction whose effect
+        has died out by a checkpoint stops there, reusing the results after it.
+        """
+        end = len(self.games)
+        start = None
+        last = None
+        inserted = False
+        for game in sorted(games, key=lambda x: x.ranked_game_number):
+            i = bisect.bisect_left(self.numbers, game.ranked_game_number)
+            if i < len(self.numbers) and self.numbers[i] == game.ranked_game_number:
+                self.games[i] = game
+            else:
+                self.games.insert(i, game)
+                self.numbers.insert(i, game.ranked_game_number)
+                inserted = True
+            start = i if start is None else min(start, i)
+            last = i if last is None else max(last, i)
+        if start is None:
+            return
+        if start >= end:
+            self._replay(end, self.state)
+        else:
+            self._replay_from_checkpoint(start, last, reuse=not inserted)
+
+    def _replay_from_checkpoint(self, start: int, last: int, reuse: bool):
+        first = start // self.every
+        old = (self.checkpoints, self.estimates, self.inconsistent, self.state)
+        self.checkpoints = self.checkpoints[: first + 1]
+        self.estimates = self.estimates[: first * self.every]
+        self.inconsistent = self.inconsistent[: first * self.every]
+        # Without inserts every game kept its index, so old results line up
+        self._replay(first * self.every, self.checkpoints[first], last if reuse else None, old)
+
+    def _replay(self, begin: int, state: ReplayState, changed: Optional[int] = None, old: tuple = None):
+        for i in range(begin, len(self.games)):
+            if i % self.every == 0 and i // self.every >= len(self.checkpoints):
+                j = i // self.every
+                if changed is not None and i > changed and j < len(old[0]) and old[0][j] == state:
+                    self.checkpoints += old[0][j:]
+                    self.estimates += old[1][i:]
+                    self.inconsistent += old[2][i:]
+                    self.state = old[3]
+                    return
+                self.checkpoints.append(state)
+            state, estimate, inconsistent = step(state, self.games[i])
+            self.estimates.append(estimate)
+            self.inconsistent.append(inconsistent)
+            self.replayed += 1
+        self.state = state
+
+    def state_at(self, ranked_game_number: int) -> Optional[ReplayState]:
+        """The state right after a game, replayed from the checkpoint before it"""
+        i = bisect.bisect_left(self.numbers, ranked_game_number)
+        if i == len(self.numbers) or self.numbers[i] != ranked_game_number:
+            return None
+        state = self.checkpoints[i // self.every]
+        for game in self.games[i // self.every * self.every : i + 1]:
+            state = step(state, game)[0]
+        return state
+
+    def estimate(self, ranked_game_number: int) -> Optional[int]:
+        i = bisect.bisect_left(self.numbers, ranked_game_number)
+        if i == len(self.numbers) or self.numbers[i] != ranked_game_number:
+            return None
+        return self.estimates[i]
@@ -0,0 +1,185 @@
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+
+from config import Config
+from utils.scanner import LogEvent, RankUpdate
+
+config = Config()
+
+STORE_FILE = os.path.join(config.app_log_dir, "events.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rank_updates (
+    id INTEGER PRIMARY KEY,
+    ranked_game_number INTEGER NOT NULL UNIQUE,
+    match_date TEXT,
+    elo_rank_new INTEGER NOT NULL,
+    elo_rank_old INTEGER NOT NULL,
+    elo_change INTEGER NOT NULL,
+    total_wins INTEGER NOT NULL,
+    win_streak_value INTEGER NOT NULL,
+    source_file TEXT NOT NULL,
+    source_offset INTEGER NOT NULL,
+    line_no INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rank_updates_date ON rank_updates (match_date);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    event_date TEXT,
+    value TEXT NOT NULL,
+    occurrence INTEGER NOT NULL,
+    source_file TEXT NOT NULL,
+    source_offset INTEGER NOT NULL,
+    line_no INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_key ON events (kind, IFNULL(event_date, ''), value, occurrence);
+CREATE INDEX IF NOT EXISTS idx_events_date ON events (event_date);
+CREATE TABLE IF NOT EXISTS watermarks (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+RANK_COLUMNS = (
+    "match_date, elo_rank_new, elo_rank_old, elo_change, ranked_game_number,"
+    " total_wins, win_streak_value, source_file, source_offset, line_no"
+)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _rank_update(row) -> RankUpdate:
+    return RankUpdate(
+        file=row["source_file"],
+        offset=row["source_offset"],
+        line_no=row["line_no"],
+        timestamp=datetime.fromisoformat(row["match_date"]) if row["match_date"] else None,
+        elo_rank_new=row["elo_rank_new"],
+        elo_rank_old=row["elo_rank_old"],
+        elo_change=row["elo_change"],
+        ranked_game_number=row["ranked_game_number"],
+        total_wins=row["total_wins"],
+        win_streak_value=row["win_streak_value"],
+    )
+
+
+class EventStore:
+    """Local SQLite copy of every event parsed from the game logs.
+
+    Rank updates are unique by ranked_game_number and other events by what
+    was logged: kind, time, value and how many identical events came before
+    it in the same file. Re-reading a log or its backup copy never
+    duplicates rows, a recreated Rivals2.log's new events are kept even at
+    offsets already read, and two identical events logged in the same
+    second are both kept. Row ids only grow, which is what the watermarks
+    track.
+    """
+
+    def __init__(self, path: str = STORE_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def add_events(self, events: Iterable[LogEvent]) -> int:
+        """Store events, returns how many rank updates were new"""
+        ranks = []
+        others = []
+        seen = Counter()
+        for event in events:
+            if isinstance(event, RankUpdate):
+                ranks.append(
+                    (
+                        _iso(event.timestamp),
+                        event.elo_rank_new,
+                        event.elo_rank_old,
+                        event.elo_change,
+                        event.ranked_game_number,
+                        event.total_wins,
+                        event.win_streak_value,
+                        event.file,
+                        event.offset,
+                        event.line_no,
+                    )
+                )
+            else:
+                key = (type(event).__name__, _iso(event.timestamp), str(event[-1]))
+                occurrence = seen[event.file, key]
+                seen[event.file, key] += 1
+                others.append(
+                    (
+                        *key,
+                        occurrence,
+                        event.file,
+                        event.offset,
+                        event.line_no,
+                    )
+                )
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO rank_updates ({RANK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ranks,
+            )
+            added = self.conn.total_changes - before
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO events (kind, event_date, value, occurrence, source_file, source_offset, line_no)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                others,
+            )
+        return added
+
+    def get_watermark(self, name: str) -> int:
+        row = self.conn.execute(
+            "SELECT value FROM watermarks WHERE name = ?", (name,)
+        ).fetchone()
+        return row["value"] if row else 0
+
+    def set_watermark(self, name: str, value: int):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO watermarks (name, value) VALUES (?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (name, value),
+            )
+
+    def rank_updates_since(self, watermark: int) -> list[tuple[int, RankUpdate]]:
+        """(row id, rank update) for every row stored after the watermark"""
+        rows = self.conn.execute(
+            f"SELECT id, {RANK_COLUMNS} FROM rank_updates WHERE id > ? ORDER BY ranked_game_number",
+            (watermark,),
+        ).fetchall()
+        return [(row["id"], _rank_update(row)) for row in rows]
+
+    def get_rank_update(self, ranked_game_number: int) -> Optional[RankUpdate]:
+        row = self.conn.execute(
+            f"SELECT {RANK_COLUMNS} FROM rank_updates WHERE ranked_game_number = ?",
+            (ranked_game_number,),
+        ).fetchone()
+        return _rank_update(row) if row else None
+
+    def latest_rank_update(self) -> Optional[RankUpdate]:
+        row = self.conn.execute(
+            f"SELECT {RANK_COLUMNS} FROM rank_updates ORDER BY ranked_game_number DESC LIMIT 1"
+        ).fetchone()
+        return _rank_update(row) if row else None
+
+    def events_between(self, start: datetime, end: datetime) -> list[tuple[str, Optional[datetime], str]]:
+        """(kind, time, value) of the non rank events logged in [start, end]"""
+        rows = self.conn.execute(
+            "SELECT kind, event_date, value FROM events"
+            " WHERE event_date BETWEEN ? AND ? ORDER BY event_date, id",
+            (start.isoformat(), end.isoformat()),
+        ).fetchall()
+        return [
+            (row["kind"], datetime.fromisoformat(row["event_date"]), row["value"])
+            for row in rows
+        ]
@@ -1,5 +1,7 @@
+import json
 import os
 import sys
+import tempfile
 from utils.log import setup_logging
 
 logger = setup_logging()
@@ -7,6 +9,22 @@ logger = setup_logging()
 def get_files(folder: os.path) -> list[str]:
     return os.listdir(folder)
 
+def write_json(path: str, data):
+    """Write data as JSON to path, atomically.
+
+    Every write gets its own temp file next to path that then replaces it,
+    so two threads saving at once never share a temp file or leave a half
+    written one in place.
+    """
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, path)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+
 def main():
     return 0
 
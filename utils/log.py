@@ -1,6 +1,8 @@
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import multiprocessing
 import os
+from contextlib import contextmanager
 
 from config import Config
 config = Config()
@@ -21,21 +23,51 @@ def setup_logging():
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    file_handler = RotatingFileHandler(
-        os.path.join(config.app_log_dir, config.app_log_file),
-        maxBytes=int(config.max_log_size),
-        backupCount=int(config.backup_count),
-    )
-
-    file_handler.setFormatter(formatter)
-    file_handler.setLevel(logging.DEBUG if int(config.debug) else logging.INFO)
-
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.DEBUG if int(config.debug) else logging.INFO)
 
     if not logger.handlers:
-        logger.addHandler(file_handler)
+        # Only the main process writes app.log, several rotating handlers on
+        # one file would rotate it under each other. Pool workers log to the
+        # console, or through worker_logging's queue
+        if multiprocessing.parent_process() is None:
+            file_handler = RotatingFileHandler(
+                os.path.join(config.app_log_dir, config.app_log_file),
+                maxBytes=int(config.max_log_size),
+                backupCount=int(config.backup_count),
+            )
+            file_handler.setFormatter(formatter)
+            file_handler.setLevel(logging.DEBUG if int(config.debug) else logging.INFO)
+            logger.addHandler(file_handler)
         logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+
+    return logger
+
+
+def worker_logging(queue):
+    """Process pool initializer, sends the worker's log records to queue.
+
+    Replaces whatever handlers the worker inherited or set up on import.
+    """
+    logger = logging.getLogger()
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(queue))
+
+
+@contextmanager
+def worker_log_queue():
+    """A queue for worker_logging whose records go to this process's handlers.
+
+        with worker_log_queue() as queue:
+            ProcessPoolExecutor(initializer=worker_logging, initargs=(queue,))
+    """
+    queue = multiprocessing.Queue()
+    listener = QueueListener(queue, *logging.getLogger().handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        yield queue
+    finally:
+        listener.stop()
+        queue.close()
\ No newline at end of file
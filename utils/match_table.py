@@ -0,0 +1,228 @@
+"""Matches held column by column in NumPy arrays.
+
+Statistics over a whole history are array operations on the columns instead
+of loops over Match objects. Opponent names are dictionary encoded: the
+opponent_name column holds codes into names, -1 for no name.
+"""
+from dataclasses import fields
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from utils import calc_elo
+from utils.match import Match
+from utils.scanner import RankUpdate
+
+# The Match fields kept as int64 columns, missing values are stored as -1
+INT_FIELDS = tuple(x.name for x in fields(Match) if x.name not in ("match_date", "opponent_name", "notes"))
+RANK_FIELDS = (
+    "elo_rank_new",
+    "elo_rank_old",
+    "elo_change",
+    "ranked_game_number",
+    "total_wins",
+    "win_streak_value",
+)
+# Per game columns are game_{1,2,3}_<field>
+GAME_FIELDS = ("char_pick", "opponent_pick", "stage", "winner", "final_move_id", "duration")
+# Names group_games accepts for the per game fields
+GAME_KEYS = {
+    "character": "opponent_pick",
+    "my_character": "char_pick",
+    "stage": "stage",
+    "move": "final_move_id",
+}
+# game_N_winner as Copy fills it in, 1 for us and 2 for the opponent
+WINNER_ME = 1
+
+
+def _int(value: Optional[int]) -> int:
+    return -1 if value is None else value
+
+
+class MatchTable:
+    """A set of matches as parallel columns, ordered as they were added.
+
+    Columns are read with table["elo_change"]; table["opponent_name"] gives
+    the decoded names. Indexing with a boolean mask or index array returns a
+    new table sharing the name dictionary.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], names: Optional[list[str]] = None):
+        self.columns = columns
+        self.names = names if names is not None else []
+        self._codes = {x: i for i, x in enumerate(self.names)}
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[Match]) -> "MatchTable":
+        matches = list(matches)
+        names = []
+        codes = {"": -1, None: -1}
+        opponent = np.empty(len(matches), dtype=np.int32)
+        for i, match in enumerate(matches):
+            code = codes.get(match.opponent_name)
+            if code is None:
+                code = codes[match.opponent_name] = len(names)
+                names.append(match.opponent_name)
+            opponent[i] = code
+        columns = {
+            name: np.fromiter((_int(getattr(x, name)) for x in matches), dtype=np.int64, count=len(matches))
+            for name in INT_FIELDS
+        }
+        columns["match_date"] = np.array([x.match_date for x in matches], dtype="datetime64[s]")
+        columns["opponent_name"] = opponent
+        columns["notes"] = np.array([x.notes or "" for x in matches], dtype=object)
+        return cls(columns, names)
+
+    @classmethod
+    def from_rank_updates(cls, updates: Iterable[RankUpdate]) -> "MatchTable":
+        """Fill the rank columns straight from the scanner's tuples, the rest stay -1"""
+        updates = list(updates)
+        ranks = np.array([x[4:] for x in updates], dtype=np.int64).reshape(len(updates), len(RANK_FIELDS))
+        columns = {name: np.full(len(updates), -1, dtype=np.int64) for name in INT_FIELDS}
+        for i, name in enumerate(RANK_FIELDS):
+            columns[name] = ranks[:, i].copy()
+        columns["match_win"] = (columns["elo_change"] >= 0).astype(np.int64)
+        columns["match_forfeit"][:] = 0
+        columns["match_date"] = np.array([x.timestamp for x in updates], dtype="datetime64[s]")
+        columns["opponent_name"] = np.full(len(updates), -1, dtype=np.int32)
+        columns["notes"] = np.full(len(updates), "", dtype=object)
+        return cls(columns)
+
+    def to_matches(self) -> list[Match]:
+        names = np.array(self.names + [""], dtype=object)
+        rows = {name: self.columns[name].tolist() for name in INT_FIELDS}
+        dates = self.columns["match_date"].astype(object)
+        opponents = names[self.columns["opponent_name"]]
+        notes = self.columns["notes"]
+        return [
+            Match(
+                match_date=dates[i],
+                opponent_name=opponents[i],
+                notes=notes[i],
+                **{name: rows[name][i] for name in INT_FIELDS},
+            )
+            for i in range(len(self))
+        ]
+
+    def __len__(self) -> int:
+        return len(self.columns["ranked_game_number"])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == "opponent_name":
+                return np.array(self.names + [""], dtype=object)[self.columns[key]]
+            return self.columns[key]
+        return MatchTable({name: column[key] for name, column in self.columns.items()}, self.names)
+
+    def opponent_code(self, name: str) -> int:
+        """The opponent_name column's code for a name, -1 if it's not in the table"""
+        return self._codes.get(name, -1)
+
+    def where(self, **values) -> "MatchTable":
+        """Matches whose columns equal all the given values"""
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in values.items():
+            if name == "opponent_name":
+                code = self.opponent_code(value)
+                if code == -1 and value:
+                    return self[np.zeros(len(self), dtype=bool)]
+                value = code
+            mask &= self.columns[name] == value
+        return self[mask]
+
+    def between(self, start, end) -> "MatchTable":
+        """Matches played in [start, end]"""
+        dates = self.columns["match_date"]
+        return self[(dates >= np.datetime64(start, "s")) & (dates <= np.datetime64(end, "s"))]
+
+    def sorted(self) -> "MatchTable":
+        """Ordered by ranked game number"""
+        return self[np.argsort(self.columns["ranked_game_number"], kind="stable")]
+
+    def win_rate(self) -> float:
+        return float((self.columns["match_win"] == 1).mean()) if len(self) else 0.0
+
+    def mean(self, name: str) -> float:
+        return float(self.columns[name].mean()) if len(self) else 0.0
+
+    def estimate_opponent_elo(self, k: float = 24.0) -> tuple[np.ndarray, np.ndarray]:
+        """opponent_estimated_elo recomputed for every row and the inconsistent rows' mask"""
+        return calc_elo.estimate_opponent_elo_batch(
+            self.columns["elo_rank_new"],
+            self.columns["elo_change"],
+            self.columns["match_win"],
+            self.columns["opponent_elo"],
+            k,
+        )
+
+    def streaks(self) -> tuple[int, int]:
+        """Longest (win, loss) streaks, in the table's order"""
+        wins = self.columns["match_win"] == 1
+        if not len(wins):
+            return 0, 0
+        # Start and length of every run of equal results
+        starts = np.flatnonzero(np.r_[True, wins[1:] != wins[:-1]])
+        lengths = np.diff(np.r_[starts, len(wins)])
+        won = wins[starts]
+        return int(lengths[won].max(initial=0)), int(lengths[~won].max(initial=0))
+
+    def rolling(self, name: str, window: int) -> np.ndarray:
+        """Mean of a column over the last window matches, NaN until the window fills"""
+        values = self.columns[name].astype(np.float64)
+        out = np.full(len(values), np.nan)
+        if window <= 0 or len(values) < window:
+            return out
+        total = np.cumsum(np.r_[0.0, values])
+        out[window - 1 :] = (total[window:] - total[:-window]) / window
+        return out
+
+    def group_by(self, key: str, value: str = "elo_change") -> dict:
+        """{key: (matches, wins, win rate, mean of value)} for each value of a column.
+
+        Grouping by opponent_name gives names as keys, -1 (no name) is left out.
+        """
+        keys, inverse = np.unique(self.columns[key], return_inverse=True)
+        return self._aggregate(keys, inverse, self.columns["match_win"] == 1, self.columns[value], key)
+
+    def group_games(self, key: str) -> dict:
+        """{key: (games, wins, win rate, mean duration)} over every game of every set.
+
+        key is one of GAME_KEYS, e.g. "stage" groups the stage of game 1, 2
+        and 3 of all matches together. Games with no value are left out.
+        """
+        field = GAME_KEYS[key]
+        values = np.concatenate([self.columns[f"game_{n}_{field}"] for n in (1, 2, 3)])
+        winners = np.concatenate([self.columns[f"game_{n}_winner"] for n in (1, 2, 3)])
+        durations = np.concatenate([self.columns[f"game_{n}_duration"] for n in (1, 2, 3)])
+        played = values >= 0
+        keys, inverse = np.unique(values[played], return_inverse=True)
+        return self._aggregate(keys, inverse, winners[played] == WINNER_ME, durations[played], None)
+
+    def _aggregate(self, keys, inverse, wins, values, key) -> dict:
+        counts = np.bincount(inverse, minlength=len(keys))
+        won = np.bincount(inverse, weights=wins, minlength=len(keys))
+        total = np.bincount(inverse, weights=values, minlength=len(keys))
+        if key == "opponent_name":
+            keys = [self.names[x] if x >= 0 else None for x in keys]
+        else:
+            keys = keys.tolist()
+        return {
+            k: (int(n), int(w), float(w / n), float(t / n))
+            for k, n, w, t in zip(keys, counts, won, total)
+            if k is not None
+        }
+
+
+def concat(tables: Sequence[MatchTable]) -> MatchTable:
+    """One table with the rows of all of them, like a stored history plus a new parse"""
+    if not tables:
+        return MatchTable.from_matches([])
+    codes = {}
+    columns = {name: [] for name in tables[0].columns}
+    for table in tables:
+        # Re-encode each table's names into the combined dictionary, -1 stays -1
+        remap = np.array([codes.setdefault(x, len(codes)) for x in table.names] + [-1], dtype=np.int32)
+        for name, column in table.columns.items():
+            columns[name].append(remap[column] if name == "opponent_name" else column)
+    return MatchTable({name: np.concatenate(parts) for name, parts in columns.items()}, list(codes))
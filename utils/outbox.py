@@ -0,0 +1,232 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+
+from config import Config
+from utils import serialize
+from utils.log import setup_logging
+from utils.match import Match
+from utils.pipeline import check_and_post
+from utils.scanner import RankUpdate
+
+config = Config()
+
+logger = setup_logging()
+
+OUTBOX_FILE = os.path.join(config.app_log_dir, "outbox.db")
+# Seconds before the first retry, doubled per failed attempt up to RETRY_MAX
+RETRY_BASE = 5
+RETRY_MAX = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    ranked_game_number INTEGER PRIMARY KEY,
+    rank_update TEXT NOT NULL,
+    extra_data TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error TEXT NOT NULL DEFAULT '',
+    queued_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_next ON outbox (next_attempt);
+"""
+
+
+def retry_delay(attempts: int) -> float:
+    return min(RETRY_BASE * 2 ** max(attempts - 1, 0), RETRY_MAX)
+
+
+class Outbox:
+    """Matches that didn't reach the backend yet, kept on disk until they do.
+
+    Rows hold the scanner's raw rank update, the Match is only built and
+    validated at drain time for games the backend doesn't have. Rows are
+    keyed by ranked_game_number, so queueing the same game again replaces
+    it instead of adding a second copy.
+    """
+
+    def __init__(self, path: str = OUTBOX_FILE):
+        # The GUI drains from its own thread while a parse may be queueing
+        self.conn = sqlite3.connect(path, timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def add(self, updates: Iterable[RankUpdate], extra_data: Optional[dict] = None):
+        """Queue games to be sent on the next drain, with the GUI's extra_data if any"""
+        now = time.time()
+        extra = serialize.dumps(extra_data or {}).decode()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO outbox (ranked_game_number, rank_update, extra_data, attempts, next_attempt, last_error, queued_at)"
+                " VALUES (?, ?, ?, 0, ?, '', ?)"
+                " ON CONFLICT (ranked_game_number) DO UPDATE SET"
+                " rank_update = excluded.rank_update, extra_data = excluded.extra_data",
+                [(x.ranked_game_number, serialize.dump_rank_update(x).decode(), extra, now, now) for x in updates],
+            )
+
+    def due(self, limit: Optional[int] = None, now: Optional[float] = None) -> list[tuple[RankUpdate, dict]]:
+        """(rank update, extra_data) for the queued games whose retry time has come, oldest first"""
+        rows = self.conn.execute(
+            "SELECT rank_update, extra_data FROM outbox WHERE next_attempt <= ? ORDER BY ranked_game_number LIMIT ?",
+            (time.time() if now is None else now, -1 if limit is None else limit),
+        ).fetchall()
+        return [(serialize.load_rank_update(row["rank_update"]), json.loads(row["extra_data"])) for row in rows]
+
+    def clear_extra_data(self, ranked_game_numbers: Iterable[int]):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET extra_data = '{}' WHERE ranked_game_number = ?",
+                [(x,) for x in ranked_game_numbers],
+            )
+
+    def next_attempt(self) -> Optional[float]:
+        return self.conn.execute("SELECT MIN(next_attempt) FROM outbox").fetchone()[0]
+
+    def remove(self, ranked_game_numbers: Iterable[int]):
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM outbox WHERE ranked_game_number = ?",
+                [(x,) for x in ranked_game_numbers],
+            )
+
+    def record_failure(self, errors: dict[int, str]):
+        """Push each match's next attempt back exponentially"""
+        now = time.time()
+        with self.conn:
+            for ranked_game_number, error in errors.items():
+                row = self.conn.execute(
+                    "SELECT attempts FROM outbox WHERE ranked_game_number = ?", (ranked_game_number,)
+                ).fetchone()
+                if row is None:
+                    continue
+                attempts = row["attempts"] + 1
+                self.conn.execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE ranked_game_number = ?",
+                    (attempts, now + retry_delay(attempts), error, ranked_game_number),
+                )
+
+
+class _CheckOnce:
+    """check, only asking the backend about ids it hasn't answered for yet.
+
+    existing holds every id the backend confirmed having.
+    """
+
+    def __init__(self, check: Callable[[list[int]], set[int]]):
+        self.check = check
+        self.checked = set()
+        self.existing = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, ranked_game_numbers: list[int]) -> set[int]:
+        ranked_game_numbers = set(ranked_game_numbers)
+        with self._lock:
+            todo = sorted(ranked_game_numbers - self.checked)
+        if todo:
+            found = self.check(todo)
+            with self._lock:
+                self.checked.update(todo)
+                self.existing.update(found)
+        with self._lock:
+            return self.existing & ranked_game_numbers
+
+
+def _settle_extra_data(
+    outbox: Outbox,
+    due: list[tuple[RankUpdate, dict]],
+    check: Callable[[list[int]], set[int]],
+) -> tuple[dict[int, dict], dict[int, str]]:
+    """Which due game gets the GUI's extra_data, and errors for any that couldn't be settled.
+
+    Games queued by one parse share its extra_data, which belongs to a game
+    only if it's the one of them the backend doesn't have yet. The others'
+    copies are cleared, so retries keep the outcome. If the existence check
+    fails those games wait for the next drain.
+    """
+    groups = defaultdict(list)
+    for update, data in due:
+        if data:
+            groups[json.dumps(data, sort_keys=True)].append(update.ranked_game_number)
+    if not groups:
+        return {}, {}
+    grouped = [x for numbers in groups.values() for x in numbers]
+    try:
+        existing = check(grouped)
+    except Exception as e:
+        logger.error(f"Existence check of {len(grouped)} matches failed: {e}")
+        error = f"Existence check failed: {e}"
+        return {}, {x: error for x in grouped}
+    extra = {}
+    cleared = []
+    for key, numbers in groups.items():
+        new = [x for x in numbers if x not in existing]
+        if len(new) == 1:
+            extra[new[0]] = json.loads(key)
+        cleared.extend(x for x in numbers if x not in extra)
+    outbox.clear_extra_data(cleared)
+    return extra, {}
+
+
+def drain(
+    outbox: Outbox,
+    check: Callable[[list[int]], set[int]],
+    build: Callable[[RankUpdate, Optional[dict]], Match],
+    post: Callable[[list[Match]], dict[int, dict]],
+    concurrency: int = 4,
+    batch_size: int = 1,
+    limit: Optional[int] = None,
+) -> tuple[list[int], int]:
+    """Send the games that are due through the check/post pipeline.
+
+    Games the backend already has are dropped without posting again, so a
+    post that succeeded but whose reply was lost is never duplicated. build
+    turns each new game's rank update into the Match to post, with the
+    queued extra_data when it was the only new game of its parse. Each id
+    is checked at most once per drain.
+
+    Only games the backend confirmed having or that posted without an
+    error leave the outbox; everything else is retried later.
+
+    Returns the ranked game numbers now in the backend and how many games
+    are still queued.
+    """
+    due = outbox.due(limit)
+    if not due:
+        return [], len(outbox)
+    check = _CheckOnce(check)
+    extra, errors = _settle_extra_data(outbox, due, check)
+    updates = [x for x, _ in due if x.ranked_game_number not in errors]
+
+    results = check_and_post(
+        updates,
+        check,
+        lambda update: build(update, extra.get(update.ranked_game_number)),
+        post,
+        concurrency,
+        batch_size,
+    )
+    posted = set()
+    for x, res in results:
+        if isinstance(res, dict) and "error" in res:
+            errors[x.ranked_game_number] = str(res["error"])
+        elif res is not None:
+            posted.add(x.ranked_game_number)
+    queued = {x.ranked_game_number for x, _ in due}
+    sent = sorted((check.existing | posted) & queued)
+    for ranked_game_number in queued - set(sent) - errors.keys():
+        errors[ranked_game_number] = "No result from backend for match"
+    outbox.remove(sent)
+    outbox.record_failure(errors)
+    if errors:
+        logger.warning(f"{len(errors)} queued matches still failing: {sorted(errors)}")
+    return sent, len(outbox)
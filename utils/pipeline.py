@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+from utils.log import setup_logging
+from utils.match import Match
+
+logger = setup_logging()
+
+# Batches waiting between stages, producers block once this many are queued
+QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+def _batches(matches: list, size: int) -> list[list]:
+    return [matches[i : i + size] for i in range(0, len(matches), size)]
+
+
+async def _pipeline(
+    matches: list,
+    check: Callable[[list[int]], set[int]],
+    build: Callable[[Any], Match],
+    post: Optional[Callable[[list[Match]], dict[int, dict]]],
+    concurrency: int,
+    batch_size: int,
+) -> list[tuple[Match, Optional[dict]]]:
+    checked = asyncio.Queue(QUEUE_SIZE)
+    limit = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def check_batch(batch):
+        # The blocking requests calls run in threads, the semaphore caps how
+        # many are in flight across both stages
+        async with limit:
+            try:
+                existing = await asyncio.to_thread(check, [x.ranked_game_number for x in batch])
+            except Exception as e:
+                # The batch's records come back unbuilt with the error
+                logger.error(f"Existence check of {len(batch)} matches failed: {e}")
+                results.extend((x, {"error": f"Existence check failed: {e}"}) for x in batch)
+                return
+        new = [build(x) for x in batch if x.ranked_game_number not in existing]
+        if new:
+            # Waits here while the post stage is behind
+            await checked.put(new)
+
+    async def produce():
+        pending = set()
+        for batch in _batches(matches, batch_size):
+            pending.add(asyncio.create_task(check_batch(batch)))
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # Raises anything check_batch didn't turn into a result
+                    task.result()
+        if pending:
+            await asyncio.gather(*pending)
+        for _ in range(concurrency):
+            await checked.put(_DONE)
+
+    async def post_batches():
+        while (batch := await checked.get()) is not _DONE:
+            if post is None:
+                results.extend((x, None) for x in batch)
+                continue
+            async with limit:
+                try:
+                    posted = await asyncio.to_thread(post, batch)
+                except Exception as e:
+                    logger.error(f"Posting {len(batch)} matches failed: {e}")
+                    posted = {}
+                    error = f"Failed to post match to backend: {e}"
+                else:
+                    error = "No result from backend for match"
+            results.extend((x, posted.get(x.ranked_game_number, {"error": error})) for x in batch)
+
+    await asyncio.gather(produce(), *(post_batches() for _ in range(concurrency)))
+    return sorted(results, key=lambda x: x[0].ranked_game_number)
+
+
+def check_and_post(
+    matches: list,
+    check: Callable[[list[int]], set[int]],
+    build: Callable[[Any], Match],
+    post: Optional[Callable[[list[Match]], dict[int, dict]]] = None,
+    concurrency: int = 4,
+    batch_size: int = 1,
+) -> list[tuple[Match, Optional[dict]]]:
+    """Check and post matches concurrently in batches.
+
+    matches can be any records with a ranked_game_number, like the parser's
+    RankUpdate tuples; build turns the new ones into the Match to post.
+
+    Each batch's existence check runs as soon as a slot is free and its new
+    matches, passed through build, are queued for posting while later batches
+    are still being checked. At most concurrency requests are in flight and
+    the queue between the stages is bounded, so a slow backend holds back the
+    checks rather than piling up work. Without post the matches are only
+    checked.
+
+    Returns (built match, post result) for every new match, ordered by
+    ranked game number. The result is None when nothing was posted. A batch
+    whose check or post raised gets an {"error": ...} result for each of its
+    records instead, unbuilt if the check failed, so nothing goes missing.
+    """
+    if not matches:
+        return []
+    return asyncio.run(_pipeline(matches, check, build, post, max(1, concurrency), max(1, batch_size)))
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from config import Config
+from utils import backend
+from utils.folders import write_json
+from utils.log import setup_logging
+
+config = Config()
+
+logger = setup_logging()
+
+REFERENCE_FILE = os.path.join(config.app_log_dir, "reference_data.json")
+REFERENCE_PATHS = ("/characters", "/stages", "/movelist", "/movelist/top", "/tiers")
+# Cached tables younger than this are used without asking the backend
+REFERENCE_TTL = 600
+
+
+class ReferenceCache:
+    """Characters, stages, moves and tiers as last served by the backend.
+
+    Each table is stored with its ETag and Last-Modified, so revalidating a
+    stale one is a conditional GET that normally comes back 304 with no body.
+    """
+
+    def __init__(self, path: str = REFERENCE_FILE, ttl: float = REFERENCE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Couldn't read reference cache {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        write_json(self.path, self._entries)
+
+    def get(self, path: str) -> Optional[dict]:
+        """The cached table however old it is, None if never fetched"""
+        with self._lock:
+            entry = self._entries.get(path)
+        return entry["body"] if entry else None
+
+    def is_fresh(self, path: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(path)
+        return bool(entry) and time.time() - entry["fetched_at"] < self.ttl
+
+    def refresh(self, path: str, force: bool = False) -> tuple[dict, bool]:
+        """Revalidate a table with the backend if it is stale.
+
+        Raises requests exceptions like a plain GET; the cached copy is left
+        as it was. Returns the table and whether it changed.
+        """
+        if not force and self.is_fresh(path):
+            return self.get(path), False
+        with self._lock:
+            entry = self._entries.get(path)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        res = backend.get(path, headers=headers)
+        if res.status_code == 304 and entry:
+            with self._lock:
+                entry["fetched_at"] = time.time()
+                self._save()
+            return entry["body"], False
+        res.raise_for_status()
+        body = res.json()
+        changed = not entry or entry["body"] != body
+        with self._lock:
+            self._entries[path] = {
+                "body": body,
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            }
+            self._save()
+        return body, changed
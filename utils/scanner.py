@@ -0,0 +1,176 @@
+import re
+from datetime import datetime
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+
+from utils.tail import LogCheckpoint, TailReader
+from utils.timestamps import parse_log_timestamp
+
+RANK_UPDATE_MARKER = "URivalsRankUpdateMessage::OnReceivedFromServer LocalPlayerIndex"
+DURATION_MARKER = "RivalsCharacterXpEndMatchReportMessage::OnReceivedFromServer"
+# Literal shared by both server message markers, checked before anything else
+SERVER_MESSAGE_MARKER = "OnReceivedFromServer"
+
+number_re = re.compile(r"-?\d+")
+duration_re = re.compile(
+    r"RivalsCharacterXpEndMatchReportMessage::OnReceivedFromServer LocalPlayerIndex 0, matchDuration (\d+)"
+)
+character_re = re.compile(r"Character picked: (\w+)")
+stage_re = re.compile(r"Stage selected: (\w+)")
+winner_re = re.compile(r"Winner: (\w+)")
+final_move_re = re.compile(r"Final move: (\d+)")
+
+
+class RankUpdate(NamedTuple):
+    file: str
+    offset: int
+    line_no: int
+    timestamp: Optional[datetime]
+    elo_rank_new: int
+    elo_rank_old: int
+    elo_change: int
+    ranked_game_number: int
+    total_wins: int
+    win_streak_value: int
+
+
+class MatchDuration(NamedTuple):
+    file: str
+    offset: int
+    line_no: int
+    timestamp: Optional[datetime]
+    duration: int
+
+
+class CharacterPick(NamedTuple):
+    file: str
+    offset: int
+    line_no: int
+    timestamp: Optional[datetime]
+    value: str
+
+
+class StageSelect(NamedTuple):
+    file: str
+    offset: int
+    line_no: int
+    timestamp: Optional[datetime]
+    value: str
+
+
+class Winner(NamedTuple):
+    file: str
+    offset: int
+    line_no: int
+    timestamp: Optional[datetime]
+    value: str
+
+
+class FinalMove(NamedTuple):
+    file: str
+    offset: int
+    line_no: int
+    timestamp: Optional[datetime]
+    value: int
+
+
+LogEvent = Union[RankUpdate, MatchDuration, CharacterPick, StageSelect, Winner, FinalMove]
+
+# Simple "<label>: <value>" events with the literal that must be on the line
+# before their pattern is worth running
+VALUE_EVENTS = (
+    ("Character picked: ", character_re, CharacterPick),
+    ("Stage selected: ", stage_re, StageSelect),
+    ("Winner: ", winner_re, Winner),
+    ("Final move: ", final_move_re, FinalMove),
+)
+
+
+def parse_rank_update(line: str, file: str = "", offset: int = -1, line_no: int = -1) -> Optional[RankUpdate]:
+    """Build a RankUpdate from the last six numbers on a rank update line"""
+    numbers = number_re.findall(line)
+    if len(numbers) < 6:
+        return None
+    ranks = [int(x) for x in numbers[-6:]]
+    return RankUpdate(file, offset, line_no, parse_log_timestamp(line), *ranks)
+
+
+# Every event line holds at least one of these, used to jump between
+# candidate lines in mmap mode
+SCAN_MARKERS = (
+    SERVER_MESSAGE_MARKER.encode(),
+    b"picked: ",
+    b"selected: ",
+    b"Winner: ",
+    b"move: ",
+)
+
+
+def _line_events(line: str, file: str, offset: int, line_no: int) -> Iterator[LogEvent]:
+    if SERVER_MESSAGE_MARKER in line:
+        if RANK_UPDATE_MARKER in line:
+            update = parse_rank_update(line, file, offset, line_no)
+            if update:
+                yield update
+        elif DURATION_MARKER in line:
+            match = duration_re.search(line)
+            if match:
+                yield MatchDuration(
+                    file, offset, line_no, parse_log_timestamp(line), int(match.group(1))
+                )
+        return
+    for literal, pattern, event in VALUE_EVENTS:
+        if literal not in line:
+            continue
+        match = pattern.search(line)
+        if match:
+            value = match.group(1)
+            yield event(
+                file,
+                offset,
+                line_no,
+                parse_log_timestamp(line),
+                int(value) if event is FinalMove else value,
+            )
+
+
+def scan_lines(lines: Iterable[tuple[int, str]], file: str = "", first_line_no: int = 0) -> Iterator[LogEvent]:
+    """Turn (offset, line) pairs into log events in a single pass.
+
+    Almost every line is Unreal noise, so lines are rejected with plain
+    substring checks before any regex runs, and timestamps are only parsed
+    for lines that produce an event.
+    """
+    for line_no, (offset, line) in enumerate(lines, first_line_no):
+        if (
+            SERVER_MESSAGE_MARKER in line
+            or "picked: " in line
+            or "selected: " in line
+            or "Winner: " in line
+            or "move: " in line
+        ):
+            yield from _line_events(line, file, offset, line_no)
+
+
+def scan_mapped(reader: TailReader, file: str = "") -> Iterator[LogEvent]:
+    """Same events as scan_lines, but only lines holding a marker are decoded"""
+    for line_no, offset, line in reader.marker_lines(SCAN_MARKERS):
+        yield from _line_events(line, file, offset, line_no)
+
+
+def scan_files(files: list[str], checkpoints: dict[str, LogCheckpoint] = None, use_mmap: bool = False) -> Iterator[LogEvent]:
+    """Read every file once and yield its events.
+
+    When checkpoints is passed each file resumes from its checkpoint and the
+    dict is updated with where reading stopped once the file is exhausted.
+    use_mmap switches to the memory-mapped scan for very large logs.
+    """
+    for file in files:
+        reader = TailReader(
+            file, checkpoints.get(file) if checkpoints is not None else None
+        )
+        if use_mmap:
+            yield from scan_mapped(reader, file)
+        else:
+            yield from scan_lines(reader, file)
+        if checkpoints is not None:
+            checkpoints[file] = reader.checkpoint()
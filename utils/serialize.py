@@ -0,0 +1,62 @@
+"""JSON encoding for Match payloads and the other bodies the app sends.
+
+Matches go through one cached pydantic adapter, whose core schema is built
+once at import, and are written by pydantic_core's encoder. Plain dicts use
+orjson when it's installed and pydantic_core.to_json otherwise. Rank
+updates are stored as plain arrays, so nothing is validated until a Match
+is built from one.
+"""
+import json
+from datetime import datetime
+from typing import Iterable
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from utils.match import Match
+from utils.scanner import RankUpdate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_match = TypeAdapter(Match)
+_matches = TypeAdapter(list[Match])
+
+
+def dump_match(match: Match, indent: bool = False) -> bytes:
+    return _match.dump_json(match, indent=2 if indent else None)
+
+
+def dump_matches(matches: Iterable[Match]) -> bytes:
+    """A JSON array of matches, encoded into one buffer"""
+    return _matches.dump_json(matches if isinstance(matches, list) else list(matches))
+
+
+def load_match(data: str | bytes) -> Match:
+    return _match.validate_json(data)
+
+
+def load_matches(data: str | bytes) -> list[Match]:
+    return _matches.validate_json(data)
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Encode plain JSON data, like extra_data or a hand-built payload"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return to_json(obj, indent=2 if indent else None)
+
+
+def dump_rank_update(update: RankUpdate) -> bytes:
+    """The update's fields as a JSON array, the timestamp in ISO format"""
+    timestamp = update.timestamp.isoformat() if update.timestamp else None
+    return dumps([*update[:3], timestamp, *update[4:]])
+
+
+def load_rank_update(data: str | bytes) -> RankUpdate:
+    fields = json.loads(data)
+    if fields[3] is not None:
+        fields[3] = datetime.fromisoformat(fields[3])
+    return RankUpdate(*fields)
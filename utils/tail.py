@@ -0,0 +1,190 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional
+
+from config import Config
+from utils.folders import write_json
+from utils.log import setup_logging
+
+config = Config()
+
+logger = setup_logging()
+
+# log_parser's offsets, everything before them is in the event store
+CHECKPOINT_FILE = os.path.join(config.app_log_dir, "log_checkpoints.json")
+HASH_WINDOW = 4096
+# Newlines between marker hits are counted in windows this big, so memory
+# stays flat however far apart the markers are
+COUNT_WINDOW = 1 << 20
+
+# Saving reads the file and writes it back, threads take turns
+_save_lock = threading.Lock()
+
+
+@dataclass
+class LogCheckpoint:
+    path: str
+    offset: int = 0
+    size: int = 0
+    device: int = 0
+    inode: int = 0
+    tail_hash: str = ""
+
+
+def checkpoint_file(consumer: str) -> str:
+    """Checkpoint file for another reader of the same logs.
+
+    Each reader keeps its own offsets, so one advancing can't make another
+    skip lines it never processed.
+    """
+    return os.path.join(config.app_log_dir, f"log_checkpoints_{consumer}.json")
+
+
+def _tail_hash(f, offset: int) -> str:
+    """Hash the HASH_WINDOW bytes that end at offset"""
+    start = max(0, offset - HASH_WINDOW)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def _count_newlines(mm: mmap.mmap, start: int, end: int) -> int:
+    count = 0
+    for pos in range(start, end, COUNT_WINDOW):
+        count += mm[pos : min(pos + COUNT_WINDOW, end)].count(b"\n")
+    return count
+
+
+def load_checkpoint(path: str, checkpoint_file: str = CHECKPOINT_FILE) -> Optional[LogCheckpoint]:
+    if not os.path.exists(checkpoint_file):
+        return None
+    try:
+        with open(checkpoint_file, "r") as f:
+            stored = json.load(f).get(os.path.abspath(path))
+    except (OSError, ValueError) as e:
+        logger.error(f"Couldn't read checkpoint file {checkpoint_file}: {e}")
+        return None
+    return LogCheckpoint(**stored) if stored else None
+
+
+def save_checkpoint(checkpoint: LogCheckpoint, checkpoint_file: str = CHECKPOINT_FILE):
+    with _save_lock:
+        stored = {}
+        if os.path.exists(checkpoint_file):
+            try:
+                with open(checkpoint_file, "r") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+        stored[os.path.abspath(checkpoint.path)] = asdict(checkpoint)
+        write_json(checkpoint_file, stored)
+
+
+class TailReader:
+    """Iterate the complete lines appended to a log since a checkpoint.
+
+    The checkpoint is only trusted when the file is still the same file
+    (device/inode), hasn't shrunk below the stored offset and the bytes just
+    before the offset hash the same. Otherwise the game has truncated or
+    replaced the log and reading starts over from the beginning.
+
+    A trailing line without a newline is left for the next run, so the
+    game can still be in the middle of writing it. Without a checkpoint,
+    reading starts at offset, which should be the start of a line.
+    """
+
+    def __init__(self, path: str, checkpoint: Optional[LogCheckpoint] = None, offset: int = 0):
+        self.path = path
+        self.reset = False
+        self.start = self._resume_offset(checkpoint) if checkpoint else offset
+        self.offset = self.start
+        self.lines = 0
+
+    @classmethod
+    def at_end(cls, path: str) -> "TailReader":
+        """Reader positioned after the last complete line, for following a log"""
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            start = max(0, size - HASH_WINDOW)
+            f.seek(start)
+            last_newline = f.read(size - start).rfind(b"\n")
+        return cls(path, offset=start + last_newline + 1 if last_newline != -1 else start)
+
+    def _resume_offset(self, checkpoint: Optional[LogCheckpoint]) -> int:
+        if checkpoint is None or checkpoint.offset <= 0:
+            return 0
+        st = os.stat(self.path)
+        if (st.st_dev, st.st_ino) != (checkpoint.device, checkpoint.inode):
+            logger.info(f"{self.path} was replaced, reading from the start")
+        elif st.st_size < checkpoint.offset:
+            logger.info(f"{self.path} was truncated, reading from the start")
+        else:
+            with open(self.path, "rb") as f:
+                if _tail_hash(f, checkpoint.offset) == checkpoint.tail_hash:
+                    return checkpoint.offset
+            logger.info(f"{self.path} was rewritten, reading from the start")
+        self.reset = True
+        return 0
+
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        """Yield (byte offset, line) for every complete line after the checkpoint"""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            offset = self.offset
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                yield offset, raw.decode("utf-8", errors="replace")
+                offset += len(raw)
+                self.offset = offset
+                self.lines += 1
+
+    def marker_lines(self, markers: tuple[bytes, ...]) -> Iterator[tuple[int, int, str]]:
+        """Yield (line number, byte offset, line) for complete lines holding any marker.
+
+        The file is memory-mapped and searched with find, so only the lines
+        that hit a marker are ever copied out and decoded. Line numbers count
+        from the checkpoint like enumerating __iter__ would.
+        """
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= self.offset:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = mm.rfind(b"\n", self.offset) + 1
+                if end <= self.offset:
+                    return
+                line_no = 0
+                counted = self.offset
+                hits = {marker: mm.find(marker, self.offset, end) for marker in markers}
+                while True:
+                    found = [pos for pos in hits.values() if pos != -1]
+                    if not found:
+                        break
+                    pos = min(found)
+                    start = mm.rfind(b"\n", self.offset, pos) + 1 or self.offset
+                    stop = mm.find(b"\n", pos, end) + 1
+                    line_no += _count_newlines(mm, counted, start)
+                    counted = start
+                    yield line_no, start, mm[start:stop].decode("utf-8", errors="replace")
+                    for marker, hit in hits.items():
+                        if hit != -1 and hit < stop:
+                            hits[marker] = mm.find(marker, stop, end)
+                self.lines += line_no + _count_newlines(mm, counted, end)
+                self.offset = end
+
+    def checkpoint(self) -> LogCheckpoint:
+        """Checkpoint for everything consumed so far"""
+        st = os.stat(self.path)
+        with open(self.path, "rb") as f:
+            tail_hash = _tail_hash(f, self.offset)
+        return LogCheckpoint(
+            path=os.path.abspath(self.path),
+            offset=self.offset,
+            size=st.st_size,
+            device=st.st_dev,
+            inode=st.st_ino,
+            tail_hash=tail_hash,
+        )
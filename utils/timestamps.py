@@ -0,0 +1,51 @@
+import re
+from datetime import date, datetime
+from typing import Optional
+
+# Unreal prefixes every line with [YYYY.MM.DD-HH.MM.SS:mmm]
+timestamp_re = re.compile(r"\[(\d{4}\.\d{2}\.\d{2})-(\d{2}\.\d{2}\.\d{2})(?::(\d{3}))?")
+
+# Consecutive lines are almost always from the same day. One (text, date)
+# tuple swapped in a single assignment, so threads never see a mixed pair
+_cached = (None, None)
+
+
+def _day(text: str) -> date:
+    global _cached
+    cached = _cached
+    if text != cached[0]:
+        cached = _cached = (text, date(int(text[0:4]), int(text[5:7]), int(text[8:10])))
+    return cached[1]
+
+
+def parse_log_timestamp(line: str, millis: bool = False) -> Optional[datetime]:
+    """Decode the timestamp at the start of a game log line.
+
+    The fixed-width prefix is sliced directly, falling back to a regex search
+    when the line doesn't start with it.
+
+    Args:
+        line (str): Log line
+        millis (bool, optional): Keep the :mmm field as microseconds. Defaults
+            to False, which matches the whole-second dates sent to the backend.
+
+    Returns:
+        datetime: Timestamp of the line, or None if it has none
+    """
+    if line[:1] == "[" and line[11:12] == "-" and line[5:6] == "." and line[14:15] == ".":
+        day = line[1:11]
+        clock = line[12:20]
+        ms = line[21:24] if line[20:21] == ":" else ""
+    else:
+        match = timestamp_re.search(line)
+        if not match:
+            return None
+        day, clock, ms = match.group(1), match.group(2), match.group(3) or ""
+    try:
+        d = _day(day)
+        micro = int(ms) * 1000 if millis and ms.isdigit() else 0
+        return datetime(
+            d.year, d.month, d.day, int(clock[0:2]), int(clock[3:5]), int(clock[6:8]), micro
+        )
+    except ValueError:
+        return None